@@ -1,6 +1,20 @@
+import os
+import tempfile
+import time
+
 import streamlit as st
 import pandas as pd
-import numpy as np
+
+from scoring import (DEFAULT_PREP_TIME, FACTORS, PREDICTION_COLUMN, URGENCY_MULTIPLIER,
+                     draw_extreme_delay, score)
+from bulk import detect_format, formula_scorer, model_scorer, score_csv
+from charts import heatmap, small_multiples
+from instrument import METRICS, timed
+from intervals import predict_intervals, supports_intervals
+from model import load_or_train, model_label
+from registry import open_registry
+from simulation import histogram, sample_scenarios, scenario_frame, summarize
+from sweep import DISTANCE_AXIS, FACTOR_AXES, distance_range, grid_frame, sweep_grid
 
 st.set_page_config(page_title="Food Delivery Time Prediction", layout="wide")
 st.title("🍔 Food Delivery Time Prediction (Pro Version)")
@@ -41,41 +55,72 @@ time_of_day = st.sidebar.selectbox("Time of Day", ["Morning", "Lunch", "Evening"
 # Extreme Mode
 extreme = st.sidebar.checkbox("Extreme Mode (optional)")
 
-# ---------------- Prep time ----------------
-default_prep_time = 10
-prep_time_dict = {"Pizza Palace": 10, "Burger Hub": 8, "Sushi World": 12, "Dessert Cafe": 6}
-prep_time = prep_time_dict.get(restaurant, default_prep_time)
+# Random seed (Extreme Mode delay and random scenarios), so results are repeatable and cacheable
+seed = st.sidebar.number_input("Random Seed", min_value=0, max_value=2**32 - 1, value=42, step=1)
 
-# ---------------- Base time ----------------
-base_time = prep_time + distance * 3
+# Prediction mode
+mode = st.sidebar.radio("Prediction Mode", ["Formula", "Trained Model"])
 
-# Traffic effect
-traffic_effect = {"Low":0, "Medium":distance*0.05, "High":distance*0.1}[traffic]
+# Stage timings panel (rendered at the end of the script)
+debug = st.sidebar.checkbox("Show debug timings")
 
-# Weather effect
-weather_effect = {"Clear":0, "Cloudy":distance*0.02, "Rainy":distance*0.05, "Stormy":distance*0.15}[weather]
 
-# Vehicle effect
-vehicle_effect = {"Bike":0, "EV":-distance*0.03, "Drone":-distance*0.06}[vehicle]
+# ---------------- Trained model ----------------
+@st.cache_resource
+def get_model():
+    # Loaded (or trained from the CSV) once per server process, shared across sessions;
+    # served by the flat-array engine, which is much cheaper than sklearn for one row
+    return load_or_train(flat=True)
 
-# Festival effect
-festival_effect = 20 if festival else 0
 
-# Time of Day effect
-time_effect = {"Morning":0, "Lunch":10, "Evening":15, "Night":5}[time_of_day]
+# ---------------- Restaurant registry ----------------
+@st.cache_resource
+def get_registry():
+    # One SQLite connection and lookup cache per server process, seeded from PREP_TIMES
+    return open_registry()
 
-# Urgency multiplier
-urgency_multiplier = {"Normal":1, "Express":0.85, "Priority":0.7}[urgency]
 
-# Extreme mode
-extreme_effect = distance*0.2 + np.random.randint(0,30) if extreme else 0
+# ---------------- Cached computations ----------------
+# Keyed on their real inputs, so a widget change only recomputes what depends on it
+@st.cache_data(max_entries=1000)
+def estimate(distance, traffic, weather, vehicle, time_of_day, urgency, festival, prep_time,
+             extreme_delay):
+    with timed("formula"):
+        predicted, contributions = score(distance, traffic, weather, vehicle, time_of_day, urgency,
+                                         festival=festival, prep_time=prep_time,
+                                         extreme_delay=extreme_delay)
+    return float(predicted), contributions.tolist()
 
-# ---------------- Predicted Time ----------------
-predicted_time = (base_time + traffic_effect + weather_effect + vehicle_effect +
-                  festival_effect + time_effect + extreme_effect) * urgency_multiplier
 
-# Cap at 2000 minutes
-predicted_time = min(predicted_time, 2000)
+@st.cache_data(max_entries=50)
+def run_scenarios(num_scenarios, prep_time, urgency, extreme, seed):
+    # Only the table head, summary and histogram are cached, not the raw arrays
+    with timed("simulation"):
+        scenarios = sample_scenarios(num_scenarios, rng=seed, prep_time=prep_time,
+                                     urgency=urgency, extreme=extreme)
+    sim_times = scenarios[PREDICTION_COLUMN]
+    with timed("dataframe"):
+        return scenario_frame(scenarios, limit=1000), summarize(sim_times), histogram(sim_times)
+
+
+@st.cache_data(max_entries=50)
+def compute_sweep(sweep_points, urgency, festival, prep_time, extreme_delay):
+    with timed("sweep"):
+        return sweep_grid(distance_range(num=sweep_points), urgency=urgency, festival=festival,
+                          prep_time=prep_time, extreme_delay=extreme_delay)
+
+# ---------------- Prep time ----------------
+registry = get_registry()
+prep_time = registry.prep_time(restaurant, DEFAULT_PREP_TIME)
+
+# ---------------- Predicted Time ----------------
+# Formula and effect tables live in scoring.py; capped at MAX_MINUTES
+extreme_delay = int(draw_extreme_delay(rng=seed)) if extreme else None
+predicted_time, contributions = estimate(distance, traffic, weather, vehicle, time_of_day, urgency,
+                                         festival, prep_time, extreme_delay)
+(base_time, traffic_effect, weather_effect, vehicle_effect,
+ festival_effect, time_effect, extreme_effect) = contributions
+urgency_multiplier = URGENCY_MULTIPLIER[urgency]
 
 # ---------------- Display Predicted Time ----------------
 st.subheader(f"Estimated Delivery Time for {restaurant}")
@@ -87,56 +132,200 @@ else:
     color = 'red'
 st.markdown(f"<span style='color:{color}; font-size:24px'>{predicted_time:.2f} minutes</span>", unsafe_allow_html=True)
 
+# ---------------- Model-Based Prediction ----------------
+if mode == "Trained Model":
+    try:
+        model, encoder = get_model()
+    except FileNotFoundError as e:
+        st.subheader("Model-Based Prediction")
+        st.warning(f"Trained model unavailable: {e}")
+    else:
+        st.subheader(f"Model-Based Prediction ({model_label(model)})")
+        # The model was trained on the dataset's own category labels
+        st.sidebar.subheader("Model Inputs")
+        model_order = {
+            "Distance_km": distance,
+            "Weather": st.sidebar.selectbox("Weather (model)", encoder.categories_["Weather"]),
+            "Traffic_Level": st.sidebar.selectbox("Traffic (model)", encoder.categories_["Traffic_Level"]),
+            "Time_of_Day": st.sidebar.selectbox("Time of Day (model)", encoder.categories_["Time_of_Day"]),
+            "Vehicle_Type": st.sidebar.selectbox("Vehicle (model)", encoder.categories_["Vehicle_Type"]),
+            "Preparation_Time_min": prep_time,
+            "Courier_Experience_yrs": st.sidebar.number_input("Courier Experience (yrs)", 0.0, 30.0, 2.0, 0.5),
+        }
+        with timed("encode"):
+            X = encoder.encode_row(model_order)[None, :]
+        if supports_intervals(model):
+            # Point estimate and the 10th-90th percentile of the trees, from one pass
+            with timed("predict"):
+                band = predict_intervals(model, X).iloc[0]
+            model_time = band["prediction"]
+            st.markdown(f"<span style='font-size:24px'>{model_time:.2f} minutes</span> "
+                        f"(likely {band['p10']:.0f}–{band['p90']:.0f} min)", unsafe_allow_html=True)
+        else:
+            with timed("predict"):
+                model_time = float(model.predict(X)[0])
+            st.markdown(f"<span style='font-size:24px'>{model_time:.2f} minutes</span>", unsafe_allow_html=True)
+
 # ---------------- Factor Contribution ----------------
 st.subheader("Factor Contribution (Minutes)")
-factor_df = pd.DataFrame({
-    'Factor': ['Base Time', 'Traffic', 'Weather', 'Vehicle', 'Festival', 'Time of Day', 'Extreme Mode'],
-    'Minutes': [base_time, traffic_effect, weather_effect, vehicle_effect, festival_effect, time_effect, extreme_effect]
-})
-st.bar_chart(factor_df.set_index('Factor'))
+with timed("dataframe"):
+    factor_df = pd.DataFrame({
+        'Factor': FACTORS,
+        'Minutes': contributions
+    })
+with timed("chart"):
+    st.bar_chart(factor_df.set_index('Factor'))
 
 # ---------------- Random Scenario Simulation ----------------
-st.subheader("Random Scenario Analysis")
-num_scenarios = st.slider("Number of Random Scenarios", 1, 20, 5)
-
-if st.button("Generate Random Scenarios"):
-    results = []
-    for _ in range(num_scenarios):
-        rand_distance = round(np.random.uniform(0.1, 100.0),2)
-        rand_traffic = np.random.choice(["Low","Medium","High"])
-        rand_weather = np.random.choice(["Clear","Cloudy","Rainy","Stormy"])
-        rand_vehicle = np.random.choice(["Bike","EV","Drone"])
-        rand_festival = np.random.choice([True,False])
-        rand_time = np.random.choice(["Morning","Lunch","Evening","Night"])
-
-        rand_base = prep_time_dict.get(restaurant, default_prep_time) + rand_distance*3
-        rand_total = (rand_base +
-                      {"Low":0, "Medium":rand_distance*0.05, "High":rand_distance*0.1}[rand_traffic] +
-                      {"Clear":0, "Cloudy":rand_distance*0.02, "Rainy":rand_distance*0.05, "Stormy":rand_distance*0.15}[rand_weather] +
-                      {"Bike":0, "EV":-rand_distance*0.03, "Drone":-rand_distance*0.06}[rand_vehicle] +
-                      (20 if rand_festival else 0) +
-                      {"Morning":0,"Lunch":10,"Evening":15,"Night":5}[rand_time] +
-                      (rand_distance*0.2 + np.random.randint(0,30) if extreme else 0)
-                     ) * urgency_multiplier
-        rand_total = min(rand_total,2000)
-        results.append([rand_distance, rand_traffic, rand_weather, rand_vehicle, rand_festival, rand_time, round(rand_total,2)])
-
-    scenario_df = pd.DataFrame(results, columns=['Distance (km)','Traffic','Weather','Vehicle','Festival','Time of Day','Predicted Time (min)'])
-    st.dataframe(scenario_df)
-
-    st.write("**Summary:**")
-    st.write(f"Minimum Time: {scenario_df['Predicted Time (min)'].min():.2f} min")
-    st.write(f"Maximum Time: {scenario_df['Predicted Time (min)'].max():.2f} min")
-    st.write(f"Average Time: {scenario_df['Predicted Time (min)'].mean():.2f} min")
+# Fragments rerun on their own widgets only, without recomputing the rest of the page
+@st.fragment
+def scenario_section(prep_time, urgency, extreme, seed):
+    st.subheader("Random Scenario Analysis")
+    num_scenarios = st.select_slider(
+        "Number of Random Scenarios",
+        options=[10, 100, 1_000, 10_000, 100_000, 1_000_000, 5_000_000],
+        value=10_000,
+    )
+
+    if st.button("Generate Random Scenarios"):
+        # Sampled and scored as whole arrays in simulation.py
+        sample_df, summary, hist_df = run_scenarios(num_scenarios, prep_time, urgency, extreme, seed)
+
+        st.write(f"**Sample (first {len(sample_df):,} of {num_scenarios:,} scenarios):**")
+        with timed("chart"):
+            st.dataframe(sample_df)
+
+        st.write("**Summary:**")
+        cols = st.columns(len(summary))
+        for col, (name, value) in zip(cols, summary.items()):
+            col.metric(name, f"{value:.2f} min")
+
+        st.write("**Distribution of Predicted Time:**")
+        with timed("chart"):
+            st.bar_chart(hist_df)
+
+
+scenario_section(prep_time, urgency, extreme, seed)
+
 
 # ---------------- Line Chart: Delivery Time vs Distance ----------------
-st.subheader(f"Delivery Time vs Distance Simulation for {restaurant}")
-distance_sim = np.linspace(0.5,50,50)
-sim_times = []
-for d in distance_sim:
-    sim_time = (prep_time + d*3 +
-                traffic_effect + weather_effect + vehicle_effect +
-                festival_effect + time_effect + extreme_effect) * urgency_multiplier
-    sim_times.append(sim_time)
-line_df = pd.DataFrame({'Distance (km)': distance_sim, 'Predicted Time (min)': sim_times})
-st.line_chart(line_df.set_index('Distance (km)'))
+@st.fragment
+def sweep_section(restaurant, selection, urgency, festival, prep_time, extreme_delay):
+    st.subheader(f"Delivery Time vs Distance Simulation for {restaurant}")
+    sweep_points = st.slider("Distance resolution (points)", 50, 2000, 200, step=50)
+    # One broadcast over distance x traffic x weather x vehicle x time of day (sweep.py)
+    grid, axes = compute_sweep(sweep_points, urgency, festival, prep_time, extreme_delay)
+    with timed("dataframe"):
+        line_df = grid_frame(grid, axes, fixed=selection)
+    with timed("chart"):
+        st.line_chart(line_df.set_index(DISTANCE_AXIS))
+
+    # ---------------- Sensitivity Surface ----------------
+    st.subheader("Sensitivity Surface")
+    col1, col2 = st.columns(2)
+    row_factor = col1.selectbox("Heatmap / line factor", list(FACTOR_AXES), index=0)
+    facet_factor = col2.selectbox("Panel factor", [f for f in FACTOR_AXES if f != row_factor], index=0)
+
+    with timed("dataframe"):
+        heat_df = grid_frame(grid, axes, fixed={k: v for k, v in selection.items() if k != row_factor})
+        multiples_df = grid_frame(grid, axes, fixed={k: v for k, v in selection.items()
+                                                     if k not in (row_factor, facet_factor)})
+    with timed("chart"):
+        st.altair_chart(heatmap(heat_df, row_factor))
+        st.altair_chart(small_multiples(multiples_df, color=row_factor, facet=facet_factor))
+
+
+selection = {"Traffic": traffic, "Weather": weather, "Vehicle": vehicle, "Time of Day": time_of_day}
+sweep_section(restaurant, selection, urgency, festival, prep_time, extreme_delay)
+
+
+# ---------------- Bulk Order Scoring ----------------
+# Scored files live here until replaced; ones left behind by ended sessions expire
+BULK_DIR = os.path.join(tempfile.gettempdir(), "delivery_bulk")
+BULK_MAX_AGE = 24 * 3600  # seconds
+
+
+def remove_expired_results(now):
+    for entry in os.scandir(BULK_DIR):
+        if entry.is_file() and now - entry.stat().st_mtime > BULK_MAX_AGE:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+@st.fragment
+def bulk_section(urgency, festival, prep_time):
+    st.subheader("Bulk Order Scoring")
+    uploaded = st.file_uploader(
+        "Upload a CSV of orders: formula columns (distance, traffic, weather, vehicle, time_of_day, ...) "
+        "or the dataset's columns (Distance_km, Weather, ...) for the trained model",
+        type="csv",
+    )
+    if uploaded is None:
+        return
+    try:
+        file_format = detect_format(pd.read_csv(uploaded, nrows=0).columns)
+    except ValueError as e:
+        st.error(str(e))
+        return
+    uploaded.seek(0)
+
+    if st.button(f"Score orders ({'trained model' if file_format == 'model' else 'formula'})"):
+        if file_format == "model":
+            try:
+                score_chunk = model_scorer(*get_model())
+            except FileNotFoundError as e:
+                st.error(f"Trained model unavailable: {e}")
+                return
+        else:
+            # Sidebar settings fill in the optional columns the file does not have
+            score_chunk = formula_scorer(get_registry(), urgency=urgency, festival=festival,
+                                         prep_time=prep_time)
+
+        previous = st.session_state.pop("bulk_result", None)
+        if previous and os.path.exists(previous["path"]):
+            os.remove(previous["path"])
+        # Scored chunk by chunk into a file on disk, so memory does not grow with the upload
+        os.makedirs(BULK_DIR, exist_ok=True)
+        remove_expired_results(time.time())
+        fd, path = tempfile.mkstemp(prefix="scored_", suffix=".csv", dir=BULK_DIR)
+        bar = st.progress(0.0, text="Scoring...")
+        try:
+            with os.fdopen(fd, "w", newline="") as out:
+                rows = score_csv(uploaded, out, score_chunk,
+                                 progress=lambda done: bar.progress(done, text=f"Scoring... {done:.0%}"))
+        except (ValueError, KeyError) as e:
+            os.remove(path)
+            st.error(f"Could not score {uploaded.name}: {e}")
+            return
+        bar.progress(1.0, text=f"Scored {rows:,} orders")
+        st.session_state["bulk_result"] = {"path": path, "rows": rows, "name": uploaded.name}
+
+    result = st.session_state.get("bulk_result")
+    if result and os.path.exists(result["path"]):
+        st.write(f"**Scored {result['rows']:,} orders from {result['name']}** (first 100 shown)")
+        st.dataframe(pd.read_csv(result["path"], nrows=100))
+        path = result["path"]
+        st.download_button("Download scored CSV", data=lambda: open(path, "rb"),
+                           file_name=f"scored_{result['name']}", mime="text/csv")
+
+
+bulk_section(urgency, festival, prep_time)
+
+
+# ---------------- Debug Timings ----------------
+# Process-wide totals since server start (instrument.py); cached calls only count misses
+if debug:
+    with st.sidebar.expander("Stage timings", expanded=True):
+        snapshot = METRICS.snapshot()
+        if snapshot["timers"]:
+            timings = pd.DataFrame(snapshot["timers"]).T
+            timings["calls"] = timings["calls"].astype(int)
+            timings[["total_s", "max_s", "last_s"]] *= 1000
+            st.dataframe(timings.rename(columns={"total_s": "total ms", "max_s": "max ms",
+                                                 "last_s": "last ms"}).round(2))
+        for name, value in snapshot["counters"].items():
+            st.write(f"{name}: {value:,}")
+        st.download_button("Prometheus metrics", METRICS.to_prometheus(), "metrics.prom")
+        st.button("Reset timings", on_click=METRICS.reset)
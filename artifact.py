@@ -0,0 +1,153 @@
+"""On-disk model artifact.
+
+An artifact is a directory of versions plus a `CURRENT` file naming the
+live one. Every save writes a new version directory and then swaps
+`CURRENT` with os.replace(), so a save never modifies files that running
+processes have memory-mapped, and a load sees either the old version or
+the new one, never a mix. The newest KEEP_VERSIONS versions are kept;
+older ones are deleted (open memory maps stay valid after unlinking).
+
+A version directory holds:
+
+- `meta.json`: format version, training column order and free-form
+  metadata (metrics, training parameters, library versions);
+- one `.npy` file per forest.FOREST_ARRAYS entry, the flattened trees
+  (forests and single trees only; listed under "arrays");
+- `estimator.joblib`: the fitted estimator itself, uncompressed.
+
+The `.npy` files are opened with `np.load(mmap_mode="r")`, so loading an
+artifact reads only the small JSON file and every worker process on a
+host shares the same page-cache copy of the tree arrays. The estimator is
+only unpickled when `ModelArtifact.estimator` is first used; sklearn
+copies tree nodes into private buffers on unpickling, so it is the flat
+arrays that should be used for serving from many processes.
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import sklearn
+
+from forest import FOREST_ARRAYS, flatten_forest, forest_depth
+
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+ESTIMATOR_FILE = "estimator.joblib"
+CURRENT_FILE = "CURRENT"
+VERSION_PREFIX = "v"
+KEEP_VERSIONS = 2
+
+
+class ModelArtifact:
+    """A loaded artifact; arrays are memory-mapped, the estimator is lazy."""
+
+    def __init__(self, path, meta, arrays, mmap_mode="r"):
+        self.path = path
+        self.meta = meta
+        self.arrays = arrays
+        self.mmap_mode = mmap_mode
+        self._estimator = None
+
+    @property
+    def columns(self):
+        return self.meta["columns"]
+
+    @property
+    def metadata(self):
+        return self.meta["metadata"]
+
+    @property
+    def estimator(self):
+        if self._estimator is None:
+            self._estimator = joblib.load(os.path.join(self.path, ESTIMATOR_FILE),
+                                          mmap_mode=self.mmap_mode)
+        return self._estimator
+
+
+def is_forest(model):
+    """Whether `model` is a sklearn tree or forest that flatten_forest() supports."""
+    return hasattr(getattr(model, "estimators_", [model])[0], "tree_")
+
+
+def version_path(path):
+    """The directory of the live version (`path` itself for the old flat layout)."""
+    try:
+        with open(os.path.join(path, CURRENT_FILE)) as f:
+            return os.path.join(path, f.read().strip())
+    except FileNotFoundError:
+        return path
+
+
+def _write_files(version, model, columns, metadata):
+    forest = is_forest(model)
+    if forest:
+        for name, array in flatten_forest(model).items():
+            np.save(os.path.join(version, f"{name}.npy"), array)
+    joblib.dump(model, os.path.join(version, ESTIMATOR_FILE))
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "columns": list(columns),
+        "estimator": type(model).__name__,
+        "arrays": list(FOREST_ARRAYS) if forest else [],
+        "n_trees": len(getattr(model, "estimators_", [model])) if forest else None,
+        "max_depth": int(forest_depth(model)) if forest else None,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "versions": {"sklearn": sklearn.__version__, "numpy": np.__version__},
+        "metadata": metadata,
+    }
+    with open(os.path.join(version, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def _write_version(path, model, columns, metadata):
+    os.makedirs(path, exist_ok=True)
+    # Nanosecond prefix keeps version names in save order
+    version = tempfile.mkdtemp(prefix=f"{VERSION_PREFIX}{time.time_ns()}-", dir=path)
+    os.chmod(version, 0o755)  # mkdtemp makes it private to the owner
+    try:
+        _write_files(version, model, columns, metadata)
+    except BaseException:
+        # A half-written version must not survive to be kept by pruning
+        shutil.rmtree(version, ignore_errors=True)
+        raise
+    return os.path.basename(version)
+
+
+def _remove_old_versions(path, keep=KEEP_VERSIONS):
+    versions = sorted((entry.name for entry in os.scandir(path)
+                       if entry.is_dir() and entry.name.startswith(VERSION_PREFIX)),
+                      key=lambda name: int(name[len(VERSION_PREFIX):].split("-")[0]))
+    for name in versions[:-keep]:
+        shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+    # Files of the old flat layout, superseded by the versions
+    for name in [META_FILE, ESTIMATOR_FILE] + [f"{name}.npy" for name in FOREST_ARRAYS]:
+        if os.path.isfile(os.path.join(path, name)):
+            os.remove(os.path.join(path, name))
+
+
+def save_artifact(path, model, columns, **metadata):
+    """Write `model` and its training column order as a new version of `path`."""
+    version = _write_version(path, model, columns, metadata)
+    tmp_path = os.path.join(path, f"{CURRENT_FILE}.{version}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(path, CURRENT_FILE))
+    _remove_old_versions(path)
+
+
+def load_artifact(path, mmap_mode="r"):
+    """Open the live version of an artifact written by save_artifact()."""
+    path = version_path(path)
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+    if meta.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"unsupported artifact format {meta.get('format_version')!r} in {path}")
+    arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+              for name in meta.get("arrays", FOREST_ARRAYS)}
+    return ModelArtifact(path, meta, arrays, mmap_mode)
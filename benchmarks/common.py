@@ -0,0 +1,61 @@
+"""Synthetic inputs and timing helpers shared by the benchmarks."""
+import time
+
+import numpy as np
+import pandas as pd
+
+from ingest import CATEGORIES
+from model import TARGET
+from scoring import TIMES_OF_DAY, TRAFFIC_LEVELS, URGENCY_LEVELS, VEHICLE_TYPES, WEATHER_CONDITIONS
+
+
+def random_orders(n, rng=None):
+    """Orders with the dataset's columns and a plausible target."""
+    rng = np.random.default_rng(rng)
+    orders = pd.DataFrame({column: pd.Categorical.from_codes(rng.integers(0, len(labels), n), labels)
+                           for column, labels in CATEGORIES.items()})
+    orders["Distance_km"] = rng.uniform(0.5, 20, n).round(2)
+    orders["Preparation_Time_min"] = rng.integers(5, 30, n)
+    orders["Courier_Experience_yrs"] = rng.integers(0, 10, n).astype(float)
+    orders[TARGET] = (orders["Distance_km"] * 3 + orders["Preparation_Time_min"]
+                      + rng.normal(0, 5, n)).round()
+    return orders
+
+
+def random_app_orders(n, rng=None):
+    """Orders in scoring.py's vocabulary, as used by the app.py formula."""
+    rng = np.random.default_rng(rng)
+    labels = {"traffic": TRAFFIC_LEVELS, "weather": WEATHER_CONDITIONS, "vehicle": VEHICLE_TYPES,
+              "time_of_day": TIMES_OF_DAY, "urgency": URGENCY_LEVELS}
+    orders = pd.DataFrame({column: pd.Categorical.from_codes(rng.integers(0, len(values), n), values)
+                           for column, values in labels.items()})
+    orders["distance"] = rng.uniform(0.1, 100.0, n).round(2)
+    orders["festival"] = rng.random(n) < 0.5
+    orders["prep_time"] = rng.integers(6, 13, n)
+    return orders
+
+
+def app_formula(distance, traffic, weather, vehicle, time_of_day, urgency="Normal",
+                festival=False, prep_time=10):
+    """One order scored the way the original app.py did: plain Python, dict lookups."""
+    base_time = prep_time + distance * 3
+    traffic_effect = {"Low": 0, "Medium": distance * 0.05, "High": distance * 0.1}[traffic]
+    weather_effect = {"Clear": 0, "Cloudy": distance * 0.02, "Rainy": distance * 0.05,
+                      "Stormy": distance * 0.15}[weather]
+    vehicle_effect = {"Bike": 0, "EV": -distance * 0.03, "Drone": -distance * 0.06}[vehicle]
+    festival_effect = 20 if festival else 0
+    time_effect = {"Morning": 0, "Lunch": 10, "Evening": 15, "Night": 5}[time_of_day]
+    urgency_multiplier = {"Normal": 1, "Express": 0.85, "Priority": 0.7}[urgency]
+    predicted = (base_time + traffic_effect + weather_effect + vehicle_effect
+                 + festival_effect + time_effect) * urgency_multiplier
+    return min(predicted, 2000)
+
+
+def best_of(fn, repeat):
+    """Fastest of `repeat` calls, in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
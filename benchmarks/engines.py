@@ -0,0 +1,60 @@
+"""Random forest vs histogram gradient boosting.
+
+    python -m benchmarks.engines [--data Food_Delivery_Times.csv]
+
+Trains both model types on the same split (on the CSV if given, otherwise
+on random orders) and reports fit time, pickled model size, predict
+latency for one order and for 10k orders, and test accuracy. The forest's
+single-order latency is also given for FlatForest, which is how the app
+and the service serve it.
+"""
+import argparse
+import pickle
+import time
+
+import pandas as pd
+
+from benchmarks.common import best_of, random_orders
+from forest import FlatForest
+from model import MODEL_TYPES, load_data, train_model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", help="training CSV or Parquet directory (random orders if omitted)")
+    parser.add_argument("--rows", type=int, default=100_000, help="random orders to train on")
+    parser.add_argument("--n-estimators", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    df = load_data(args.data) if args.data else random_orders(args.rows, rng=0)
+    batch = random_orders(10_000, rng=1)
+
+    rows = []
+    for model_type in MODEL_TYPES:
+        params = {"max_iter": args.n_estimators} if model_type == "hgb" else {
+            "n_estimators": args.n_estimators}
+        start = time.perf_counter()
+        model, encoder, metrics = train_model(df, model_type=model_type, **params)
+        fit_time = time.perf_counter() - start
+
+        X = encoder.transform(batch)
+        one = X[:1]
+        result = {
+            "model": model_type,
+            **metrics,
+            "fit_s": fit_time,
+            "size_mb": len(pickle.dumps(model)) / 2**20,
+            "latency_1_ms": best_of(lambda: model.predict(one), 20) * 1e3,
+            "latency_10k_ms": best_of(lambda: model.predict(X), 3) * 1e3,
+        }
+        if model_type == "forest":
+            flat = FlatForest.from_model(model)
+            result["flat_latency_1_ms"] = best_of(lambda: flat.predict(one), 20) * 1e3
+        rows.append(result)
+
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(pd.DataFrame(rows).set_index("model").round(3))
+
+
+if __name__ == "__main__":
+    main()
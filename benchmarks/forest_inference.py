@@ -0,0 +1,45 @@
+"""FlatForest vs RandomForestRegressor.predict latency.
+
+    python -m benchmarks.forest_inference [--data Food_Delivery_Times.csv]
+
+Trains a forest (on the CSV if given, otherwise on random orders), checks
+that both engines agree, then times 1, 100 and 100k-row batches.
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import best_of, random_orders
+from forest import FlatForest
+from model import load_data, train_model
+
+BATCH_SIZES = (1, 100, 100_000)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", help="training CSV (random orders if omitted)")
+    parser.add_argument("--n-estimators", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    df = load_data(args.data) if args.data else random_orders(1000, rng=0)
+    model, encoder, _ = train_model(df, n_estimators=args.n_estimators)
+    model.set_params(n_jobs=None)
+    flat = FlatForest.from_model(model)
+
+    rows = random_orders(max(BATCH_SIZES), rng=1)
+    X = encoder.transform(rows)
+    diff = np.abs(flat.predict(X) - model.predict(X)).max()
+    print(f"Trees: {flat.n_trees}, depth: {flat.depth}, max |flat - sklearn|: {diff:.2e}")
+
+    print(f"{'rows':>8} {'sklearn ms':>12} {'flat ms':>10} {'speedup':>8}")
+    for n in BATCH_SIZES:
+        batch = X[:n]
+        repeat = 20 if n < 10_000 else 3
+        sk = best_of(lambda: model.predict(batch), repeat)
+        fl = best_of(lambda: flat.predict(batch), repeat)
+        print(f"{n:>8} {sk * 1e3:>12.3f} {fl * 1e3:>10.3f} {sk / fl:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Benchmark suite for scoring, simulation, encoding, training and inference.
+
+    python -m benchmarks.suite --sizes 1k,100k,10M --out bench.json
+    python -m benchmarks.suite --sizes 1k,100k --baseline bench.json
+
+Each benchmark runs on synthetic data at every requested size (setup is not
+timed) and reports the best of a few repeats. Benchmarks that would be
+impractical at a size (e.g. the per-order Python loop at 10M rows) are
+recorded as skipped. Results are written as JSON together with the
+environment they were measured in; with --baseline, entries slower than
+the baseline by more than --threshold are listed and the exit code is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import RandomForestRegressor
+
+from benchmarks.common import app_formula, best_of, random_app_orders, random_orders
+from forest import FlatForest
+from geo import CourierIndex, haversine_km
+from model import FEATURE_COLUMNS, TARGET, make_encoder
+from scoring import score_orders
+from simulation import sample_scenarios
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+DEFAULT_SIZES = "1k,100k,10M"
+TRAIN_ROWS = 10_000  # forest used by the predict benchmarks
+
+# name -> (setup(n, rng) returning the callable to time, largest n it runs at)
+BENCHMARKS = {}
+
+
+def benchmark(name, max_rows=None):
+    def register(setup):
+        BENCHMARKS[name] = (setup, max_rows)
+        return setup
+    return register
+
+
+@benchmark("heuristic_scalar", max_rows=1_000_000)
+def _heuristic_scalar(n, rng):
+    # The per-order Python arithmetic app.py used before scoring.py
+    rows = random_app_orders(n, rng).astype(object).to_dict("records")
+    return lambda: [app_formula(**row) for row in rows]
+
+
+@benchmark("heuristic_vectorized")
+def _heuristic_vectorized(n, rng):
+    orders = random_app_orders(n, rng)
+    return lambda: score_orders(orders)
+
+
+@benchmark("simulation")
+def _simulation(n, rng):
+    return lambda: sample_scenarios(n, rng=rng)
+
+
+@benchmark("get_dummies_align", max_rows=1_000_000)
+def _get_dummies(n, rng):
+    train = random_orders(TRAIN_ROWS, rng)[FEATURE_COLUMNS]
+    columns = pd.get_dummies(train).columns
+    orders = random_orders(n, rng)[FEATURE_COLUMNS]
+    return lambda: pd.get_dummies(orders).reindex(columns=columns, fill_value=0)
+
+
+@benchmark("encoder_transform")
+def _encoder(n, rng):
+    encoder = make_encoder().fit(random_orders(TRAIN_ROWS, rng))
+    orders = random_orders(n, rng)
+    out = np.empty((n, encoder.n_features), dtype=np.float32)
+    return lambda: encoder.transform(orders, out=out)
+
+
+@benchmark("forest_fit", max_rows=100_000)
+def _fit(n, rng):
+    orders = random_orders(n, rng)
+    encoder = make_encoder().fit(orders)
+    X, y = encoder.transform(orders), orders[TARGET].to_numpy()
+    model = RandomForestRegressor(n_estimators=50, n_jobs=-1, random_state=0)
+    return lambda: model.fit(X, y)
+
+
+def _trained_forest(rng):
+    orders = random_orders(TRAIN_ROWS, rng)
+    encoder = make_encoder().fit(orders)
+    model = RandomForestRegressor(n_estimators=50, random_state=0)
+    model.fit(encoder.transform(orders), orders[TARGET].to_numpy())
+    return model, encoder
+
+
+@benchmark("forest_predict_sklearn", max_rows=1_000_000)
+def _predict_sklearn(n, rng):
+    model, encoder = _trained_forest(rng)
+    X = encoder.transform(random_orders(n, rng))
+    return lambda: model.predict(X)
+
+
+@benchmark("forest_predict_flat", max_rows=100_000)
+def _predict_flat(n, rng):
+    model, encoder = _trained_forest(rng)
+    flat = FlatForest.from_model(model)
+    X = encoder.transform(random_orders(n, rng))
+    return lambda: flat.predict(X)
+
+
+def _random_points(n, rng):
+    # Within ~0.5 degrees of one city centre
+    return 12.97 + rng.uniform(-0.5, 0.5, n), 77.59 + rng.uniform(-0.5, 0.5, n)
+
+
+@benchmark("haversine")
+def _haversine(n, rng):
+    (lat1, lon1), (lat2, lon2) = _random_points(n, rng), _random_points(n, rng)
+    return lambda: haversine_km(lat1, lon1, lat2, lon2)
+
+
+@benchmark("nearest_couriers", max_rows=1_000_000)
+def _nearest_couriers(n, rng):
+    index = CourierIndex(*_random_points(10_000, rng))
+    lat, lon = _random_points(n, rng)
+    return lambda: index.nearest(lat, lon, k=3)
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def run(sizes, names=None, repeat=3, seed=0):
+    """Run the selected benchmarks; returns a list of result dicts."""
+    results = []
+    for name in names or BENCHMARKS:
+        setup, max_rows = BENCHMARKS[name]
+        for label in sizes:
+            n = SIZES[label]
+            result = {"name": name, "size": label, "rows": n}
+            if max_rows is not None and n > max_rows:
+                result["skipped"] = f"limited to {max_rows:,} rows"
+            else:
+                fn = setup(n, np.random.default_rng(seed))
+                seconds = best_of(fn, repeat if n < 1_000_000 else 1)
+                result.update(seconds=seconds, rows_per_second=n / seconds)
+            results.append(result)
+            status = result.get("skipped") or f"{result['seconds'] * 1e3:.2f} ms"
+            print(f"{name:<24} {label:>5}  {status}", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Entries slower than in `baseline` by more than `threshold` (a fraction)."""
+    before = {(r["name"], r["size"]): r for r in baseline["results"] if "seconds" in r}
+    regressions = []
+    for result in results:
+        old = before.get((result["name"], result["size"]))
+        if old and "seconds" in result and result["seconds"] > old["seconds"] * (1 + threshold):
+            regressions.append({**result, "baseline_seconds": old["seconds"],
+                                "slowdown": result["seconds"] / old["seconds"]})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma-separated, from {list(SIZES)}")
+    parser.add_argument("--only", help="comma-separated benchmark names")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default="bench.json")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown, 0.1 = 10%%")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes.split(",")
+    names = args.only.split(",") if args.only else None
+    for name in [s for s in sizes if s not in SIZES] + [n for n in names or [] if n not in BENCHMARKS]:
+        parser.error(f"unknown size or benchmark {name!r}")
+
+    results = run(sizes, names, args.repeat)
+    with open(args.out, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+    print(f"Wrote {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['name']} {r['size']}: {r['baseline_seconds'] * 1e3:.2f} ms -> "
+                  f"{r['seconds'] * 1e3:.2f} ms ({r['slowdown']:.2f}x)")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Chunked scoring of order CSVs.
+
+    python bulk.py orders.csv --out scored.csv [--model delivery_model]
+
+A file with scoring.py's column names (distance, traffic, weather,
+vehicle, time_of_day, and optionally urgency, festival, prep_time,
+restaurant, extreme_delay) is scored with the app.py formula; a file with
+the dataset's feature columns (Distance_km, Weather, ...) is scored with
+the trained model. Either distance column may be replaced by restaurant
+and customer coordinates (see geo.py). The input is read `chunk_size`
+rows at a time, each chunk is scored in one vectorized call and appended
+to the output with a prediction column, so memory is bounded by the
+chunk size whatever the file size.
+"""
+import argparse
+
+import pandas as pd
+
+from geo import has_coordinates, with_distance
+from instrument import count, timed
+from intervals import predict_intervals, supports_intervals
+from model import FEATURE_COLUMNS, MODEL_PATH, load_model
+from registry import REGISTRY_PATH, open_registry
+from scoring import DEFAULT_PREP_TIME, PREDICTION_COLUMN, URGENCY_LEVELS, score_orders
+
+CHUNK_SIZE = 50_000
+FORMULA_COLUMNS = ["distance", "traffic", "weather", "vehicle", "time_of_day"]
+
+
+def detect_format(columns):
+    """"model" or "formula", from a CSV header."""
+    columns = set(columns)
+    if has_coordinates(columns):
+        columns |= {"Distance_km", "distance"}
+    if columns.issuperset(FEATURE_COLUMNS):
+        return "model"
+    if columns.issuperset(FORMULA_COLUMNS):
+        return "formula"
+    raise ValueError(f"expected columns {FORMULA_COLUMNS} (formula) or {FEATURE_COLUMNS} (model), "
+                     f"got {sorted(columns)}")
+
+
+def formula_scorer(registry=None, **defaults):
+    """Chunk scorer for the app.py formula; arguments as in score_orders().
+
+    `defaults` fill both absent optional columns and blank cells in them.
+    """
+    def score_chunk(chunk):
+        scored = score_orders(with_distance(chunk, "distance"), registry=registry, **defaults)
+        return pd.DataFrame({PREDICTION_COLUMN: scored[PREDICTION_COLUMN]})
+    return score_chunk
+
+
+def model_scorer(model, encoder):
+    """Chunk scorer for a trained model, with the trees' 10-90% band for forests."""
+    def score_chunk(chunk):
+        X = encoder.transform(with_distance(chunk))
+        if supports_intervals(model):
+            return predict_intervals(model, X).drop(columns="std").rename(
+                columns={"prediction": PREDICTION_COLUMN}).set_axis(chunk.index)
+        return pd.DataFrame({PREDICTION_COLUMN: model.predict(X)}, index=chunk.index)
+    return score_chunk
+
+
+def score_csv(source, out, score_chunk, chunk_size=CHUNK_SIZE, progress=None):
+    """Score `source` into the writable text file `out`; returns the row count.
+
+    `progress`, if given, is called after every chunk with the fraction of
+    the input consumed (from the file position when `source` is a file).
+    """
+    size = getattr(source, "size", None)
+    rows = 0
+    with pd.read_csv(source, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            with timed("bulk_score"):
+                scored = pd.concat([chunk, score_chunk(chunk).round(3)], axis=1)
+            scored.to_csv(out, header=rows == 0, index=False)
+            rows += len(chunk)
+            count("bulk_rows", len(chunk))
+            if progress is not None and size:
+                progress(min(source.tell() / size, 1.0))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV of orders")
+    parser.add_argument("csv")
+    parser.add_argument("--out", default="scored_orders.csv")
+    parser.add_argument("--model", default=MODEL_PATH, help="artifact for dataset-format files")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    # Defaults for formula-format files that lack these columns or leave cells blank
+    parser.add_argument("--urgency", default="Normal", choices=URGENCY_LEVELS)
+    parser.add_argument("--festival", action="store_true")
+    parser.add_argument("--prep-time", type=float, default=DEFAULT_PREP_TIME)
+    parser.add_argument("--registry", default=REGISTRY_PATH,
+                        help="restaurant prep-time registry for a restaurant column")
+    args = parser.parse_args(argv)
+
+    if detect_format(pd.read_csv(args.csv, nrows=0).columns) == "model":
+        score_chunk = model_scorer(*load_model(args.model, flat=True))
+    else:
+        score_chunk = formula_scorer(open_registry(args.registry), urgency=args.urgency,
+                                     festival=args.festival, prep_time=args.prep_time)
+    with open(args.out, "w", newline="") as out:
+        rows = score_csv(args.csv, out, score_chunk, args.chunk_size)
+    print(f"Scored {rows:,} orders into {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Altair charts for sweep.py results."""
+import altair as alt
+
+from scoring import PREDICTION_COLUMN
+from sweep import DISTANCE_AXIS
+
+
+def heatmap(frame, factor, value=PREDICTION_COLUMN, max_bins=100):
+    """Distance (binned) against one factor, coloured by mean predicted time."""
+    return alt.Chart(frame).mark_rect().encode(
+        x=alt.X(f"{DISTANCE_AXIS}:Q", bin=alt.Bin(maxbins=max_bins), title=DISTANCE_AXIS),
+        y=alt.Y(f"{factor}:N", sort=None),
+        color=alt.Color(f"mean({value}):Q", title="Minutes", scale=alt.Scale(scheme="viridis")),
+        tooltip=[alt.Tooltip(f"{factor}:N"),
+                 alt.Tooltip(f"mean({value}):Q", title="Minutes", format=".1f")],
+    )
+
+
+def small_multiples(frame, color, facet, value=PREDICTION_COLUMN, columns=4):
+    """Time-vs-distance lines per `color` label, one panel per `facet` label."""
+    return alt.Chart(frame).mark_line().encode(
+        x=alt.X(f"{DISTANCE_AXIS}:Q"),
+        y=alt.Y(f"{value}:Q"),
+        color=alt.Color(f"{color}:N", sort=None),
+    ).properties(width=180, height=140).facet(
+        facet=alt.Facet(f"{facet}:N", sort=None), columns=columns,
+    )
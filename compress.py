@@ -0,0 +1,197 @@
+"""Forest compression and its accuracy / size / latency trade-off.
+
+    python compress.py --data Food_Delivery_Times.csv
+
+All compression works on the flattened arrays from forest.py, so no tree
+is refitted:
+
+- `max_depth`: nodes at that depth become leaves (their stored value is
+  already the mean of the samples reaching them);
+- `min_samples_leaf`: splits whose smaller child saw fewer (bootstrap-
+  weighted) samples are collapsed;
+- `trees`: keep only a subset of trees, e.g. from select_trees(), which
+  greedily adds the tree that most lowers validation MAE;
+- `precision`: "float32" stores thresholds as the largest float32 not
+  above the float64 threshold (exact for float32 features) and leaf
+  values as float32; "float16" also quantizes leaf values to float16.
+
+Unreachable nodes are dropped and indices are narrowed to int32 where
+they fit.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import train_test_split
+
+from forest import FlatForest, flatten_forest
+from model import DATA_PATH, FEATURE_COLUMNS, TARGET, evaluate, load_data, make_encoder
+
+PRECISIONS = ("float64", "float32", "float16")
+
+# Settings compared by report(); "trees" is a count resolved by select_trees()
+DEFAULT_SETTINGS = {
+    "baseline": {},
+    "depth 12": {"max_depth": 12},
+    "depth 8": {"max_depth": 8},
+    "leaf 5": {"min_samples_leaf": 5},
+    "top 25 trees": {"trees": 25},
+    "float32": {"precision": "float32"},
+    "float16 values": {"precision": "float16"},
+    "depth 10 + 25 trees + float16": {"max_depth": 10, "trees": 25, "precision": "float16"},
+}
+
+
+def _node_depths(arrays):
+    depth = np.zeros(len(arrays["value"]), dtype=np.int64)
+    frontier = arrays["roots"]
+    level = 0
+    while len(frontier):
+        depth[frontier] = level
+        children = np.concatenate([arrays["left"][frontier], arrays["right"][frontier]])
+        frontier = children[children != np.concatenate([frontier, frontier])]
+        level += 1
+    return depth
+
+
+def _compact(arrays):
+    """Drop nodes no longer reachable from a root and renumber the rest."""
+    reachable = np.zeros(len(arrays["value"]), dtype=bool)
+    frontier = arrays["roots"]
+    while len(frontier):
+        reachable[frontier] = True
+        children = np.concatenate([arrays["left"][frontier], arrays["right"][frontier]])
+        frontier = np.unique(children[~reachable[children]])
+    new_index = np.cumsum(reachable) - 1
+    compact = {name: arrays[name][reachable] for name in arrays if name != "roots"}
+    compact["left"] = new_index[compact["left"]]
+    compact["right"] = new_index[compact["right"]]
+    compact["roots"] = new_index[arrays["roots"]]
+    return compact
+
+
+def _make_leaves(arrays, mask):
+    nodes = np.flatnonzero(mask)
+    arrays["left"][nodes] = nodes
+    arrays["right"][nodes] = nodes
+    arrays["feature"][nodes] = 0
+
+
+def _narrow(arrays, precision):
+    index_dtype = np.int32 if len(arrays["value"]) < np.iinfo(np.int32).max else np.int64
+    for name in ("roots", "left", "right"):
+        arrays[name] = arrays[name].astype(index_dtype)
+    arrays["feature"] = arrays["feature"].astype(np.int16)
+    if precision != "float64":
+        threshold = arrays["threshold"].astype(np.float32)
+        above = threshold > arrays["threshold"]
+        threshold[above] = np.nextafter(threshold[above], np.float32(-np.inf))
+        arrays["threshold"] = threshold
+        arrays["value"] = arrays["value"].astype(precision)
+    return arrays
+
+
+def compress(model, max_depth=None, min_samples_leaf=None, trees=None, precision="float64"):
+    """FlatForest of `model` with the given compression applied."""
+    if precision not in PRECISIONS:
+        raise ValueError(f"precision must be one of {PRECISIONS}, got {precision!r}")
+    arrays = {name: array.copy() for name, array in flatten_forest(model).items()}
+    samples = np.concatenate([est.tree_.weighted_n_node_samples for est in model.estimators_])
+
+    if min_samples_leaf is not None:
+        internal = arrays["left"] != np.arange(len(samples))
+        smaller = np.minimum(samples[arrays["left"]], samples[arrays["right"]])
+        _make_leaves(arrays, internal & (smaller < min_samples_leaf))
+    if max_depth is not None:
+        _make_leaves(arrays, _node_depths(arrays) >= max_depth)
+    if trees is not None:
+        arrays["roots"] = arrays["roots"][np.asarray(trees)]
+
+    arrays = _compact(arrays)
+    depth = _node_depths(arrays).max()
+    return FlatForest(_narrow(arrays, precision), depth)
+
+
+def select_trees(flat, X_val, y_val, n_trees):
+    """Greedy forward selection of `n_trees` trees minimizing validation MAE."""
+    per_tree = flat.tree_predictions(X_val)
+    y_val = np.asarray(y_val, dtype=np.float64)
+    chosen = []
+    total = np.zeros(len(y_val))
+    available = np.ones(flat.n_trees, dtype=bool)
+    for k in range(1, n_trees + 1):
+        candidates = (total[:, None] + per_tree) / k
+        mae = np.abs(candidates - y_val[:, None]).mean(axis=0)
+        mae[~available] = np.inf
+        best = int(np.argmin(mae))
+        chosen.append(best)
+        available[best] = False
+        total += per_tree[:, best]
+    return chosen
+
+
+def forest_nbytes(flat):
+    return sum(array.nbytes for array in flat.arrays.values())
+
+
+def predict_latency(flat, X, repeat=20):
+    """Best-of-`repeat` seconds for one predict() call on X."""
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        flat.predict(X)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(model, X_val, y_val, X_test, y_test, settings=None):
+    """Accuracy, size and latency of every compression setting."""
+    settings = DEFAULT_SETTINGS if settings is None else settings
+    baseline = FlatForest.from_model(model)
+    rows = []
+    for name, options in settings.items():
+        options = dict(options)
+        if isinstance(options.get("trees"), int):
+            options["trees"] = select_trees(baseline, X_val, y_val, options["trees"])
+        flat = compress(model, **options)
+        metrics = evaluate(y_test, flat.predict(X_test))
+        rows.append({
+            "setting": name,
+            **metrics,
+            "trees": flat.n_trees,
+            "nodes": len(flat.arrays["value"]),
+            "size_kb": forest_nbytes(flat) / 1024,
+            "latency_1_ms": predict_latency(flat, X_test[:1]) * 1e3,
+            "latency_1k_ms": predict_latency(flat, X_test[:1000], repeat=5) * 1e3,
+        })
+    return pd.DataFrame(rows).set_index("setting")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare forest compression settings")
+    parser.add_argument("--data", default=DATA_PATH, help="training CSV or Parquet directory")
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--random-state", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    df = load_data(args.data)
+    # Same test split as model.train_model(); tree selection gets its own
+    # validation slice of the training rows so the test set stays unseen.
+    train, test = train_test_split(df, test_size=0.2, random_state=args.random_state)
+    fit, val = train_test_split(train, test_size=0.125, random_state=args.random_state)
+    encoder = make_encoder().fit(fit[FEATURE_COLUMNS])
+
+    model = RandomForestRegressor(n_estimators=args.n_estimators, random_state=args.random_state,
+                                  n_jobs=-1)
+    model.fit(encoder.transform(fit[FEATURE_COLUMNS]), fit[TARGET].to_numpy())
+
+    table = report(model, encoder.transform(val[FEATURE_COLUMNS]), val[TARGET].to_numpy(),
+                   encoder.transform(test[FEATURE_COLUMNS]), test[TARGET].to_numpy())
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(table.round(3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Fitted one-hot encoder for delivery orders.
+
+OrderEncoder freezes the numeric column order and the category vocabulary
+seen in training. Its layout is the one `pd.get_dummies` gives on the
+training frame: numerics first, then one `<column>_<label>` column per
+category label in sorted order. Missing or unseen categories encode as
+all zeros and numeric NaNs are passed through, which the forest handles
+natively.
+
+transform() writes a whole batch into a (possibly preallocated) float32
+matrix with one scatter per categorical; encode_row() fills a single row
+from precomputed label -> column lookups without touching pandas.
+
+NativeOrderEncoder has the same interface but keeps one column per
+categorical holding the label's code (NaN if missing or unseen), for
+learners with native categorical support such as
+HistGradientBoostingRegressor.
+"""
+import numpy as np
+import pandas as pd
+
+
+class OrderEncoder:
+    """One-hot encoder with a frozen vocabulary and float32 output."""
+
+    kind = "onehot"
+
+    def __init__(self, numeric, categorical):
+        self.numeric = list(numeric)
+        self.categorical = list(categorical)
+        self.categories_ = None
+
+    def fit(self, orders):
+        self.categories_ = {}
+        for column in self.categorical:
+            values = orders[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                labels = values.cat.categories
+            else:
+                labels = values.dropna().unique()
+            self.categories_[column] = sorted(str(label) for label in labels)
+        return self._build()
+
+    @classmethod
+    def from_columns(cls, columns, categorical):
+        """Rebuild an encoder from a get_dummies column layout."""
+        categorical = list(categorical)
+        encoder = cls([], categorical)
+        encoder.categories_ = {column: [] for column in categorical}
+        for name in columns:
+            owner = next((c for c in categorical if name.startswith(f"{c}_")), None)
+            if owner is None:
+                encoder.numeric.append(name)
+            else:
+                encoder.categories_[owner].append(name[len(owner) + 1:])
+        return encoder._build()
+
+    def to_dict(self):
+        return {"kind": self.kind, "numeric": self.numeric, "categories": self.categories_}
+
+    @classmethod
+    def from_dict(cls, state):
+        cls = ENCODER_KINDS[state.get("kind", "onehot")]
+        encoder = cls(state["numeric"], list(state["categories"]))
+        encoder.categories_ = {c: list(labels) for c, labels in state["categories"].items()}
+        return encoder._build()
+
+    def _build(self):
+        # Column layout and the lookups used by encode_row()
+        self.columns = list(self.numeric)
+        self._offsets = {}
+        self._index = {}
+        for column in self.categorical:
+            self._offsets[column] = len(self.columns)
+            for label in self.categories_[column]:
+                self._index[(column, label)] = len(self.columns)
+                self.columns.append(f"{column}_{label}")
+        self._numeric_index = [(column, i) for i, column in enumerate(self.numeric)]
+        return self
+
+    @property
+    def n_features(self):
+        return len(self.columns)
+
+    def transform(self, orders, out=None):
+        """Encode a DataFrame into `out` (allocated if None) and return it."""
+        n = len(orders)
+        if out is None:
+            out = np.empty((n, self.n_features), dtype=np.float32)
+        elif out.shape != (n, self.n_features):
+            raise ValueError(f"out has shape {out.shape}, expected {(n, self.n_features)}")
+
+        for i, column in enumerate(self.numeric):
+            out[:, i] = orders[column].to_numpy(dtype=np.float32, na_value=np.nan)
+
+        out[:, len(self.numeric):] = 0
+        rows = np.arange(n)
+        for column in self.categorical:
+            codes = self._codes(column, orders[column])
+            hit = codes >= 0
+            out[rows[hit], self._offsets[column] + codes[hit]] = 1
+        return out
+
+    def _codes(self, column, values):
+        labels = self.categories_[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            if list(values.cat.categories) != labels:
+                values = values.cat.set_categories(labels)
+            return values.cat.codes.to_numpy()
+        # -1 for missing and unseen labels (pd.Categorical will raise on unseen ones)
+        return pd.Index(labels).get_indexer(values)
+
+    def encode_row(self, order, out=None):
+        """Encode one order given as a mapping of column -> value."""
+        if out is None:
+            out = np.zeros(self.n_features, dtype=np.float32)
+        else:
+            out[:] = 0
+        for column, i in self._numeric_index:
+            value = order.get(column)
+            out[i] = np.nan if value is None else value
+        index = self._index
+        for column in self.categorical:
+            j = index.get((column, order.get(column)))
+            if j is not None:
+                out[j] = 1
+        return out
+
+
+class NativeOrderEncoder(OrderEncoder):
+    """Numerics followed by one category-code column per categorical."""
+
+    kind = "native"
+
+    def _build(self):
+        self.columns = self.numeric + self.categorical
+        self._offsets = {column: len(self.numeric) + i for i, column in enumerate(self.categorical)}
+        self._index = {(column, label): code for column in self.categorical
+                       for code, label in enumerate(self.categories_[column])}
+        self._numeric_index = [(column, i) for i, column in enumerate(self.numeric)]
+        return self
+
+    @property
+    def categorical_mask(self):
+        """Boolean mask of the categorical columns, for `categorical_features`."""
+        return np.arange(self.n_features) >= len(self.numeric)
+
+    def transform(self, orders, out=None):
+        n = len(orders)
+        if out is None:
+            out = np.empty((n, self.n_features), dtype=np.float32)
+        elif out.shape != (n, self.n_features):
+            raise ValueError(f"out has shape {out.shape}, expected {(n, self.n_features)}")
+
+        for i, column in enumerate(self.numeric):
+            out[:, i] = orders[column].to_numpy(dtype=np.float32, na_value=np.nan)
+        for column in self.categorical:
+            codes = self._codes(column, orders[column])
+            out[:, self._offsets[column]] = np.where(codes >= 0, codes, np.nan)
+        return out
+
+    def encode_row(self, order, out=None):
+        if out is None:
+            out = np.empty(self.n_features, dtype=np.float32)
+        for column, i in self._numeric_index:
+            value = order.get(column)
+            out[i] = np.nan if value is None else value
+        index = self._index
+        for column in self.categorical:
+            code = index.get((column, order.get(column)))
+            out[self._offsets[column]] = np.nan if code is None else code
+        return out
+
+
+ENCODER_KINDS = {cls.kind: cls for cls in (OrderEncoder, NativeOrderEncoder)}
@@ -0,0 +1,119 @@
+"""Segmented model evaluation in one streaming pass.
+
+    python evaluation.py --model delivery_model --data held_out.csv
+
+SegmentedMetrics accumulates, per segment of every SEGMENTS column, the
+row count and the sums of error, absolute error, squared error, target
+and squared target, each with one np.bincount per column and batch. MAE,
+RMSE, bias and R2 for every segment follow from those sums, so held-out
+sets of any size are evaluated batch by batch in constant memory, and
+each slice costs a bincount rather than a metric call. Missing categories
+get their own "(missing)" segment.
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from ingest import BATCH_SIZE
+from model import CATEGORICAL_COLUMNS, MODEL_PATH, TARGET, iter_labelled, load_model
+
+DISTANCE_BUCKET = "Distance_bucket"
+DISTANCE_EDGES = [2.0, 5.0, 10.0, 15.0, 20.0]  # km
+SEGMENTS = CATEGORICAL_COLUMNS + [DISTANCE_BUCKET]
+MISSING_LABEL = "(missing)"
+SUMS = ("count", "error", "abs_error", "sq_error", "y", "y_sq")
+
+
+def distance_labels(edges=DISTANCE_EDGES):
+    bounds = [0.0] + list(edges)
+    return [f"{lo:g}-{hi:g} km" for lo, hi in zip(bounds, bounds[1:])] + [f">{edges[-1]:g} km"]
+
+
+class SegmentedMetrics:
+    """Streaming MAE / RMSE / R2 / bias, overall and per segment."""
+
+    def __init__(self, categories, edges=DISTANCE_EDGES):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.labels = {column: list(categories[column]) for column in CATEGORICAL_COLUMNS}
+        self.labels[DISTANCE_BUCKET] = distance_labels(edges)
+        # Per segment column: one row per sum, one slot per label plus missing
+        self.sums = {column: np.zeros((len(SUMS), len(labels) + 1))
+                     for column, labels in self.labels.items()}
+
+    def _codes(self, column, orders):
+        n_labels = len(self.labels[column])
+        if column == DISTANCE_BUCKET:
+            distance = orders["Distance_km"].to_numpy(dtype=np.float64, na_value=np.nan)
+            codes = np.searchsorted(self.edges, distance, side="left")
+            return np.where(np.isnan(distance), n_labels, codes)
+        # -1 for missing and unseen labels (pd.Categorical will raise on unseen ones)
+        codes = pd.Index(self.labels[column]).get_indexer(orders[column])
+        return np.where(codes < 0, n_labels, codes)
+
+    def update(self, orders, y_true, y_pred):
+        y_true = np.asarray(y_true, dtype=np.float64)
+        error = np.asarray(y_pred, dtype=np.float64) - y_true
+        weights = (None, error, np.abs(error), error * error, y_true, y_true * y_true)
+        for column, sums in self.sums.items():
+            codes = self._codes(column, orders)
+            for i, w in enumerate(weights):
+                sums[i] += np.bincount(codes, weights=w, minlength=sums.shape[1])
+        return self
+
+    def _metrics(self, sums):
+        count, error, abs_error, sq_error, y, y_sq = sums
+        with np.errstate(invalid="ignore", divide="ignore"):
+            total_ss = y_sq - y * y / count
+            return {"count": count.astype(np.int64), "MAE": abs_error / count,
+                    "RMSE": np.sqrt(sq_error / count), "R2": 1 - sq_error / total_ss,
+                    "bias": error / count}
+
+    def overall(self):
+        """Metrics over every row seen."""
+        sums = next(iter(self.sums.values())).sum(axis=1)
+        return {name: value.item() for name, value in self._metrics(sums).items()}
+
+    def table(self, min_count=1):
+        """One row per (segment, value) with at least `min_count` rows."""
+        frames = []
+        for column, sums in self.sums.items():
+            frame = pd.DataFrame(self._metrics(sums))
+            frame.insert(0, "value", self.labels[column] + [MISSING_LABEL])
+            frame.insert(0, "segment", column)
+            frames.append(frame[frame["count"] >= max(min_count, 1)])
+        return pd.concat(frames, ignore_index=True)
+
+
+def evaluate_segments(model, encoder, batches, edges=DISTANCE_EDGES):
+    """SegmentedMetrics of `model` over batches of labelled orders."""
+    metrics = SegmentedMetrics(encoder.categories_, edges)
+    for batch in batches:
+        metrics.update(batch, batch[TARGET], model.predict(encoder.transform(batch)))
+    return metrics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-segment accuracy of a saved model")
+    parser.add_argument("--model", default=MODEL_PATH, help="artifact directory")
+    parser.add_argument("--data", required=True, help="held-out orders: CSV or Parquet directory")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--min-count", type=int, default=30, help="hide smaller segments")
+    parser.add_argument("--sort", default="MAE", choices=["MAE", "RMSE", "R2", "bias", "count"],
+                        help="metric to sort segments by (worst first)")
+    args = parser.parse_args(argv)
+
+    model, encoder = load_model(args.model)
+    metrics = evaluate_segments(model, encoder, iter_labelled(args.data, args.batch_size))
+    overall = metrics.overall()
+    print(f"Overall ({overall['count']:,} orders): " +
+          ", ".join(f"{k}={v:.4f}" for k, v in overall.items() if k != "count"))
+    table = metrics.table(args.min_count)
+    table = table.sort_values(args.sort, ascending=args.sort == "R2")
+    with pd.option_context("display.width", 200, "display.max_rows", None):
+        print(table.round(4).to_string(index=False))
+    return table
+
+
+if __name__ == "__main__":
+    main()
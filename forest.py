@@ -0,0 +1,126 @@
+"""Flat array representation of a fitted RandomForestRegressor.
+
+flatten_forest() concatenates the node arrays of every tree in
+`estimators_` into one set of contiguous arrays. Child indices are global
+(offset by the tree's root position) and leaves point to themselves, so a
+row can be walked down any tree for a fixed number of steps without
+checking whether it has already reached a leaf.
+"""
+import numpy as np
+
+# Array name -> dtype, as stored by flatten_forest()
+FOREST_ARRAYS = {
+    "roots": np.int64,         # index of each tree's root node
+    "feature": np.int32,       # split feature (0 for leaves)
+    "threshold": np.float64,   # go left when x[feature] <= threshold
+    "left": np.int64,          # global index of the left child (self for leaves)
+    "right": np.int64,         # global index of the right child (self for leaves)
+    "missing_left": np.bool_,  # NaN goes left at this split
+    "value": np.float64,       # node mean; the prediction at leaves
+}
+
+
+def flatten_forest(model):
+    """Dict of FOREST_ARRAYS for a fitted forest (or single tree) regressor."""
+    trees = [est.tree_ for est in getattr(model, "estimators_", [model])]
+    sizes = np.array([t.node_count for t in trees], dtype=np.int64)
+    roots = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+
+    left, right, feature = [], [], []
+    for tree, root in zip(trees, roots):
+        nodes = np.arange(tree.node_count, dtype=np.int64) + root
+        is_leaf = tree.children_left < 0
+        left.append(np.where(is_leaf, nodes, tree.children_left + root))
+        right.append(np.where(is_leaf, nodes, tree.children_right + root))
+        feature.append(np.where(is_leaf, 0, tree.feature))
+
+    arrays = {
+        "roots": roots,
+        "feature": np.concatenate(feature),
+        "threshold": np.concatenate([t.threshold for t in trees]),
+        "left": np.concatenate(left),
+        "right": np.concatenate(right),
+        "missing_left": np.concatenate([t.missing_go_to_left for t in trees]),
+        "value": np.concatenate([t.value[:, 0, 0] for t in trees]),
+    }
+    return {name: np.ascontiguousarray(arrays[name], dtype=dtype)
+            for name, dtype in FOREST_ARRAYS.items()}
+
+
+def forest_depth(model):
+    """Deepest tree in the forest, i.e. the traversal steps a row needs."""
+    return max(est.tree_.max_depth for est in getattr(model, "estimators_", [model]))
+
+
+class FlatForest:
+    """Batch inference over flattened trees, without sklearn.
+
+    Every row walks every tree in lock-step: one gather per level for the
+    split feature, threshold and child of the current node of each
+    (row, tree) pair. Leaves point to themselves, so after `depth` steps
+    each pair sits on its leaf. Rows are processed in blocks of
+    `batch_size` to keep the (rows x trees) working arrays cache-sized.
+
+    This removes sklearn's fixed per-call cost, which dominates for one or
+    a few rows; for very large batches sklearn's compiled per-row loop is
+    faster (see benchmarks/forest_inference.py).
+
+    Matches `RandomForestRegressor.predict` (up to float rounding of the
+    mean), including sklearn's handling of NaN features.
+    """
+
+    def __init__(self, arrays, depth, batch_size=1024):
+        self.arrays = arrays
+        self.depth = int(depth)
+        self.batch_size = batch_size
+        self.n_trees = len(arrays["roots"])
+
+    @classmethod
+    def from_model(cls, model, **kwargs):
+        return cls(flatten_forest(model), forest_depth(model), **kwargs)
+
+    @classmethod
+    def from_artifact(cls, artifact, **kwargs):
+        """Serve straight from an artifact's memory-mapped arrays."""
+        return cls(artifact.arrays, artifact.meta["max_depth"], **kwargs)
+
+    def _leaves(self, X, out):
+        a = self.arrays
+        # Gathering from the raveled block is cheaper than take_along_axis
+        flat_X = np.ascontiguousarray(X).ravel()
+        row_start = (np.arange(len(X)) * X.shape[1])[:, None]
+        node = a["roots"][None, :]
+        for _ in range(self.depth):
+            x = flat_X[row_start + a["feature"][node]]
+            go_left = x <= a["threshold"][node]
+            missing = np.isnan(x)
+            if missing.any():
+                go_left = np.where(missing, a["missing_left"][node], go_left)
+            node = np.where(go_left, a["left"][node], a["right"][node])
+        out[:] = node
+        return out
+
+    def apply(self, X):
+        """Leaf node index (into the flat arrays) per row and tree."""
+        X = np.asarray(X, dtype=np.float32)
+        leaves = np.empty((len(X), self.n_trees), dtype=np.int64)
+        for start in range(0, len(X), self.batch_size):
+            stop = start + self.batch_size
+            self._leaves(X[start:stop], leaves[start:stop])
+        return leaves
+
+    def tree_predictions(self, X, out=None):
+        """Per-tree predictions as a (rows x trees) array."""
+        X = np.asarray(X, dtype=np.float32)
+        if out is None:
+            out = np.empty((len(X), self.n_trees), dtype=np.float64)
+        value = self.arrays["value"]
+        node = np.empty((min(len(X), self.batch_size), self.n_trees), dtype=np.int64)
+        for start in range(0, len(X), self.batch_size):
+            block = X[start:start + self.batch_size]
+            leaves = self._leaves(block, node[:len(block)])
+            out[start:start + len(block)] = value[leaves]
+        return out
+
+    def predict(self, X):
+        return self.tree_predictions(X).mean(axis=1)
@@ -0,0 +1,136 @@
+"""Great-circle distances and a nearest-courier index.
+
+    python geo.py orders.csv --out with_distance.csv [--couriers couriers.csv --k 3]
+
+haversine_km() works on whole arrays (with NumPy broadcasting), so the
+distance of every restaurant/customer pair in a dispatch wave is one
+array expression. CourierIndex wraps a BallTree over courier positions
+with the haversine metric: k-nearest and within-radius queries for a
+whole wave of restaurants are one tree query each, without comparing
+every restaurant with every courier.
+
+Coordinates are in degrees, distances in kilometres.
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+EARTH_RADIUS_KM = 6371.0088  # mean radius
+RESTAURANT_COLUMNS = ("restaurant_lat", "restaurant_lon")
+CUSTOMER_COLUMNS = ("customer_lat", "customer_lon")
+COURIER_COLUMNS = ("courier_id", "lat", "lon")
+CHUNK_SIZE = 100_000
+
+
+def _radians(lat, lon):
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    if np.any(np.abs(lat) > 90) or np.any(np.abs(lon) > 180):
+        raise ValueError("latitudes must be within [-90, 90] and longitudes within [-180, 180]")
+    return np.radians(lat), np.radians(lon)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km between (lat1, lon1) and (lat2, lon2), elementwise."""
+    lat1, lon1 = _radians(lat1, lon1)
+    lat2, lon2 = _radians(lat2, lon2)
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    # Clip guards arcsin against rounding just above 1 for antipodal points
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def order_distances(orders, restaurant=RESTAURANT_COLUMNS, customer=CUSTOMER_COLUMNS):
+    """Restaurant-to-customer distance in km for every row of `orders`."""
+    missing = [column for column in (*restaurant, *customer) if column not in orders]
+    if missing:
+        raise ValueError(f"missing coordinate columns {missing}")
+    return haversine_km(orders[restaurant[0]], orders[restaurant[1]],
+                        orders[customer[0]], orders[customer[1]])
+
+
+def has_coordinates(columns):
+    return set(columns).issuperset(RESTAURANT_COLUMNS + CUSTOMER_COLUMNS)
+
+
+def with_distance(orders, column="Distance_km"):
+    """`orders` with `column` computed from coordinates, if it is absent and they are present."""
+    if column in orders or not has_coordinates(orders.columns):
+        return orders
+    return orders.assign(**{column: order_distances(orders)})
+
+
+class CourierIndex:
+    """BallTree over courier positions for nearest-courier queries."""
+
+    def __init__(self, lat, lon, ids=None, leaf_size=40):
+        lat, lon = _radians(lat, lon)
+        self.ids = np.arange(len(lat)) if ids is None else np.asarray(ids)
+        if len(self.ids) != len(lat):
+            raise ValueError(f"got {len(self.ids)} ids for {len(lat)} couriers")
+        self.tree = BallTree(np.column_stack([lat, lon]), leaf_size=leaf_size, metric="haversine")
+
+    @classmethod
+    def from_frame(cls, couriers, columns=COURIER_COLUMNS):
+        id_column, lat_column, lon_column = columns
+        ids = couriers[id_column] if id_column in couriers else None
+        return cls(couriers[lat_column], couriers[lon_column], ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _points(self, lat, lon):
+        lat, lon = _radians(lat, lon)
+        return np.column_stack([np.atleast_1d(lat), np.atleast_1d(lon)])
+
+    def nearest(self, lat, lon, k=1):
+        """(distances_km, courier_ids), each (n_points, k), nearest first."""
+        if not 1 <= k <= len(self):
+            raise ValueError(f"k must be between 1 and {len(self)}, got {k}")
+        distances, indices = self.tree.query(self._points(lat, lon), k=k)
+        return distances * EARTH_RADIUS_KM, self.ids[indices]
+
+    def within(self, lat, lon, radius_km):
+        """Per point, (distances_km, courier_ids) of couriers within `radius_km`, nearest first."""
+        indices, distances = self.tree.query_radius(
+            self._points(lat, lon), r=radius_km / EARTH_RADIUS_KM, return_distance=True,
+            sort_results=True)
+        return [(d * EARTH_RADIUS_KM, self.ids[i]) for d, i in zip(distances, indices)]
+
+
+def nearest_couriers(orders, index, k=1, restaurant=RESTAURANT_COLUMNS):
+    """Columns courier_<j> and courier_<j>_km for the k couriers nearest each restaurant."""
+    distances, ids = index.nearest(orders[restaurant[0]], orders[restaurant[1]], k)
+    columns = {}
+    for j in range(k):
+        columns[f"courier_{j + 1}"] = ids[:, j]
+        columns[f"courier_{j + 1}_km"] = distances[:, j]
+    return pd.DataFrame(columns, index=orders.index)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Add distances (and nearest couriers) to orders")
+    parser.add_argument("csv", help="orders with restaurant_lat/lon and customer_lat/lon")
+    parser.add_argument("--out", default="orders_with_distance.csv")
+    parser.add_argument("--column", default="Distance_km", help="name of the distance column")
+    parser.add_argument("--couriers", help="CSV of courier_id, lat, lon")
+    parser.add_argument("--k", type=int, default=1, help="nearest couriers per order")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    index = CourierIndex.from_frame(pd.read_csv(args.couriers)) if args.couriers else None
+    rows = 0
+    with open(args.out, "w", newline="") as out:
+        for chunk in pd.read_csv(args.csv, chunksize=args.chunk_size):
+            chunk[args.column] = order_distances(chunk).round(3)
+            if index is not None:
+                chunk = pd.concat([chunk, nearest_couriers(chunk, index, args.k).round(3)], axis=1)
+            chunk.to_csv(out, header=rows == 0, index=False)
+            rows += len(chunk)
+    print(f"Wrote {rows:,} orders to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Precomputed prediction grid for the trained model.
+
+    python grid.py --model delivery_model --data Food_Delivery_Times.csv --out delivery_grid
+
+Every feature but Distance_km, Preparation_Time_min and
+Courier_Experience_yrs is a low-cardinality categorical, so the model can
+be evaluated once over the full categorical product and a lattice of the
+three numerics. The result is a dense float32 array with one axis per
+feature; every axis has one extra trailing slot for a missing (or, for
+categoricals, unseen) value. Predicting is then a category index lookup
+plus trilinear interpolation between the 8 surrounding lattice points,
+without touching the forest. Numerics outside the lattice are clamped.
+
+The build measures the grid against the exact model on sample orders and
+stores the error next to the grid.
+"""
+import argparse
+import itertools
+import json
+import os
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+
+from model import DATA_PATH, FEATURE_COLUMNS, MODEL_PATH, load_data, load_model
+
+VALUES_FILE = "grid.npy"
+META_FILE = "grid.json"
+
+# Default numeric lattices
+LATTICE = {
+    "Distance_km": np.linspace(0.0, 25.0, 51),
+    "Preparation_Time_min": np.arange(0.0, 41.0, 2.0),
+    "Courier_Experience_yrs": np.arange(0.0, 11.0),
+}
+
+
+class PredictionGrid:
+    """Dense table of model predictions with interpolated lookup."""
+
+    def __init__(self, values, categories, lattice, error=None):
+        self.values = values
+        self.categories = categories
+        self.lattice = {name: np.asarray(axis, dtype=np.float64) for name, axis in lattice.items()}
+        self.error = error
+        self._index = {column: {label: i for i, label in enumerate(labels)}
+                       for column, labels in categories.items()}
+        self._axis_lists = {name: axis.tolist() for name, axis in self.lattice.items()}
+
+    @classmethod
+    def build(cls, model, encoder, lattice=None, batch_size=100_000):
+        """Evaluate `model` on every grid point."""
+        lattice = LATTICE if lattice is None else lattice
+        categories = {column: list(encoder.categories_[column]) for column in encoder.categorical}
+        numeric_axes = [np.append(np.asarray(lattice[c], dtype=np.float64), np.nan)
+                        for c in encoder.numeric]
+        shape = [len(labels) + 1 for labels in categories.values()] + [len(a) for a in numeric_axes]
+
+        # Numeric block shared by every categorical combination
+        mesh = [axis.ravel() for axis in np.meshgrid(*numeric_axes, indexing="ij")]
+        block_size = len(mesh[0])
+        # Label per code, with None in the extra missing slot
+        labels = {column: np.array(values + [None], dtype=object)
+                  for column, values in categories.items()}
+
+        combos = np.array(list(itertools.product(*[range(n) for n in shape[:len(categories)]])))
+        per_batch = max(1, batch_size // block_size)
+        values = np.empty((len(combos), block_size), dtype=np.float32)
+        for start in range(0, len(combos), per_batch):
+            chunk = combos[start:start + per_batch]
+            # Encoded through the encoder, so any of its layouts works
+            orders = {column: np.tile(axis, len(chunk)) for column, axis in zip(encoder.numeric, mesh)}
+            for k, column in enumerate(categories):
+                orders[column] = labels[column][np.repeat(chunk[:, k], block_size)]
+            X = encoder.transform(pd.DataFrame(orders))
+            values[start:start + len(chunk)] = model.predict(X).reshape(len(chunk), block_size)
+        return cls(values.reshape(shape), categories,
+                   {c: lattice[c] for c in encoder.numeric})
+
+    def _categorical_codes(self, column, values):
+        index = self._index[column]
+        missing = len(index)
+        return np.fromiter((index.get(v, missing) for v in values), dtype=np.intp, count=len(values))
+
+    def _numeric_position(self, name, values):
+        # Lower lattice index and interpolation weight; NaNs go to the extra slot
+        axis = self.lattice[name]
+        values = np.asarray(values, dtype=np.float64)
+        missing = np.isnan(values)
+        clamped = np.clip(np.where(missing, axis[0], values), axis[0], axis[-1])
+        lower = np.clip(np.searchsorted(axis, clamped, side="right") - 1, 0, len(axis) - 2)
+        weight = (clamped - axis[lower]) / (axis[lower + 1] - axis[lower])
+        lower = np.where(missing, len(axis), lower)
+        weight = np.where(missing, 0.0, weight)
+        return lower, weight
+
+    def predict(self, orders):
+        """Interpolated predictions for a DataFrame (or dict of columns) of orders."""
+        index = tuple(self._categorical_codes(c, list(orders[c])) for c in self.categories)
+        positions = [self._numeric_position(name, orders[name]) for name in self.lattice]
+
+        result = np.zeros(len(index[0]) if index else len(positions[0][0]))
+        for corner in itertools.product((0, 1), repeat=len(positions)):
+            weight = np.ones_like(result)
+            numeric_index = []
+            for (lower, w), step in zip(positions, corner):
+                weight = weight * (w if step else 1 - w)
+                # NaN slots have weight 0 on the upper corner, so stay in range
+                numeric_index.append(np.minimum(lower + step, lower + (w > 0)))
+            result += weight * self.values[index + tuple(numeric_index)]
+        return result
+
+    def predict_row(self, order):
+        """Interpolated prediction for one order given as a dict.
+
+        Plain-Python version of predict() for the single-order hot path:
+        a few dict lookups, one bisect per numeric and 8 scalar reads.
+        """
+        base = tuple(index.get(order.get(column), len(index))
+                     for column, index in self._index.items())
+        corners = []
+        for name, axis in self._axis_lists.items():
+            value = order.get(name)
+            if value is None or value != value:
+                corners.append(((len(axis), 1.0),))
+                continue
+            value = min(max(value, axis[0]), axis[-1])
+            i = min(max(bisect_right(axis, value) - 1, 0), len(axis) - 2)
+            w = (value - axis[i]) / (axis[i + 1] - axis[i])
+            corners.append(((i, 1.0 - w), (i + 1, w)))
+
+        total = 0.0
+        for corner in itertools.product(*corners):
+            weight = 1.0
+            for _, w in corner:
+                weight *= w
+            if weight:
+                total += weight * float(self.values[base + tuple(i for i, _ in corner)])
+        return total
+
+    def measure_error(self, model, encoder, orders):
+        """Absolute error of the grid against the exact model on `orders`."""
+        exact = model.predict(encoder.transform(orders))
+        error = np.abs(self.predict(orders) - exact)
+        return {"max": float(error.max()), "mean": float(error.mean()),
+                "p99": float(np.percentile(error, 99)), "rows": int(len(error))}
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, VALUES_FILE), self.values)
+        meta = {"categories": self.categories,
+                "lattice": {name: axis.tolist() for name, axis in self.lattice.items()},
+                "error": self.error}
+        with open(os.path.join(path, META_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        values = np.load(os.path.join(path, VALUES_FILE), mmap_mode=mmap_mode)
+        return cls(values, meta["categories"], meta["lattice"], meta["error"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute the model's prediction grid")
+    parser.add_argument("--model", default=MODEL_PATH, help="artifact directory")
+    parser.add_argument("--data", default=DATA_PATH, help="orders used to measure the error")
+    parser.add_argument("--out", default="delivery_grid")
+    args = parser.parse_args(argv)
+
+    # sklearn's compiled loop is the faster engine for batches this large
+    model, encoder = load_model(args.model)
+    grid = PredictionGrid.build(model, encoder)
+    print(f"Grid shape: {grid.values.shape} ({grid.values.nbytes / 2**20:.1f} MB)")
+    if os.path.exists(args.data):
+        grid.error = grid.measure_error(model, encoder, load_data(args.data)[FEATURE_COLUMNS])
+        print("Error vs exact model (min): " +
+              ", ".join(f"{k}={v:.3f}" for k, v in grid.error.items() if k != "rows"))
+    grid.save(args.out)
+
+
+if __name__ == "__main__":
+    main()
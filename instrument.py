@@ -0,0 +1,91 @@
+"""Named stage timers and counters.
+
+    from instrument import count, timed
+
+    with timed("encode"):
+        X = encoder.transform(orders)
+    count("rows_read", len(orders))
+
+Everything is recorded in one process-wide registry (METRICS), which the
+app's debug panel reads with snapshot() and batch jobs and the prediction
+service export with to_prometheus(). A timer costs two perf_counter()
+calls and a lock, so it belongs around stages, not around per-row code.
+"""
+import numbers
+import threading
+import time
+from contextlib import contextmanager
+
+PROMETHEUS_PREFIX = "delivery"
+
+
+class Metrics:
+    """Thread-safe registry of stage timers and counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # stage -> [calls, total seconds, max seconds, last seconds]
+            self.timers = {}
+            self.counters = {}
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            entry = self.timers.setdefault(stage, [0, 0.0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+            entry[3] = seconds
+
+    @contextmanager
+    def timed(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self):
+        """Copy of the current values as plain dicts."""
+        with self._lock:
+            timers = {stage: {"calls": calls, "total_s": total, "max_s": peak, "last_s": last}
+                      for stage, (calls, total, peak, last) in self.timers.items()}
+            return {"timers": timers, "counters": dict(self.counters)}
+
+    @staticmethod
+    def _sample(value):
+        # Integers exactly, floats at full precision (":g" keeps only 6 digits)
+        return str(int(value)) if isinstance(value, numbers.Integral) else repr(float(value))
+
+    def to_prometheus(self, prefix=PROMETHEUS_PREFIX):
+        """Prometheus text exposition format (e.g. for node_exporter's textfile collector)."""
+        snapshot = self.snapshot()
+        lines = []
+        for field, suffix, kind, help_text in (
+                ("total_s", "stage_seconds_total", "counter", "Seconds spent in each stage"),
+                ("calls", "stage_calls_total", "counter", "Times each stage ran"),
+                ("max_s", "stage_seconds_max", "gauge", "Slowest single run of each stage")):
+            name = f"{prefix}_{suffix}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            lines += [f'{name}{{stage="{stage}"}} {self._sample(values[field])}'
+                      for stage, values in sorted(snapshot["timers"].items())]
+        for counter, value in sorted(snapshot["counters"].items()):
+            name = f"{prefix}_{counter}_total"
+            lines += [f"# TYPE {name} counter", f"{name} {self._sample(value)}"]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path, prefix=PROMETHEUS_PREFIX):
+        with open(path, "w") as f:
+            f.write(self.to_prometheus(prefix))
+
+
+METRICS = Metrics()
+timed = METRICS.timed
+count = METRICS.count
@@ -0,0 +1,58 @@
+"""Prediction bands from the spread of a forest's trees.
+
+Every tree's prediction is collected once into a preallocated
+(rows x trees) block, and the point prediction, standard deviation and
+all requested quantiles are reduced from that one block, so a band costs
+one forest evaluation plus a sort along the tree axis, not one predict()
+per quantile. Large inputs are processed `batch_size` rows at a time,
+reusing the same block.
+
+The band is the spread of the trees' predictions, i.e. the model's own
+uncertainty; it is narrower than the spread of actual delivery times.
+"""
+import numpy as np
+import pandas as pd
+
+from forest import FlatForest
+
+QUANTILES = (0.1, 0.9)
+BATCH_SIZE = 10_000
+
+
+def quantile_column(q):
+    return f"p{q * 100:g}"
+
+
+def supports_intervals(model):
+    """Whether `model` is a FlatForest or an sklearn forest."""
+    return isinstance(model, FlatForest) or hasattr(model, "estimators_")
+
+
+def tree_predictions(model, X, out=None):
+    """Per-tree predictions of a FlatForest or fitted sklearn forest into `out`."""
+    if isinstance(model, FlatForest):
+        return model.tree_predictions(X, out)
+    estimators = model.estimators_
+    if out is None:
+        out = np.empty((len(X), len(estimators)), dtype=np.float64)
+    for j, tree in enumerate(estimators):
+        out[:, j] = tree.predict(X)
+    return out
+
+
+def predict_intervals(model, X, quantiles=QUANTILES, batch_size=BATCH_SIZE):
+    """DataFrame with the prediction, the trees' std and one column per quantile."""
+    X = np.asarray(X, dtype=np.float32)
+    n_trees = model.n_trees if isinstance(model, FlatForest) else len(model.estimators_)
+    quantiles = np.asarray(quantiles, dtype=np.float64)
+    result = np.empty((len(X), 2 + len(quantiles)))
+    block = np.empty((min(len(X), batch_size), n_trees))
+    for start in range(0, len(X), batch_size):
+        rows = X[start:start + batch_size]
+        per_tree = tree_predictions(model, rows, block[:len(rows)])
+        out = result[start:start + len(rows)]
+        out[:, 0] = per_tree.mean(axis=1)
+        out[:, 1] = per_tree.std(axis=1)
+        out[:, 2:] = np.quantile(per_tree, quantiles, axis=1).T
+    columns = ["prediction", "std"] + [quantile_column(q) for q in quantiles]
+    return pd.DataFrame(result, columns=columns)
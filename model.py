@@ -0,0 +1,159 @@
+"""Random forest delivery-time model from Food_Delivery_Time_Prediction.py.
+
+Training follows the notebook (80/20 split with random_state=42, one-hot
+categoricals, RandomForestRegressor(random_state=42)) except that Order_ID
+is not used as a feature and the one-hot step is a fitted OrderEncoder
+rather than per-frame pd.get_dummies plus align. The model is saved as an
+artifact (see artifact.py) together with the encoder, so serving encodes
+new orders exactly as training did.
+
+`model_type="hgb"` trains a HistGradientBoostingRegressor instead, on a
+NativeOrderEncoder layout: categoricals are split natively on their codes
+and missing values are learned as their own branch.
+"""
+import os
+
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+
+from artifact import load_artifact, save_artifact
+from encoder import NativeOrderEncoder, OrderEncoder
+from forest import FlatForest
+from ingest import BATCH_SIZE, iter_batches, read_dataset
+from instrument import timed
+from storage import iter_orders, read_orders
+
+DATA_PATH = "Food_Delivery_Times.csv"
+MODEL_PATH = "delivery_model"
+
+ID_COLUMN = "Order_ID"
+TARGET = "Delivery_Time_min"
+NUMERIC_COLUMNS = ["Distance_km", "Preparation_Time_min", "Courier_Experience_yrs"]
+CATEGORICAL_COLUMNS = ["Weather", "Traffic_Level", "Time_of_Day", "Vehicle_Type"]
+MODEL_TYPES = ("forest", "hgb")
+# Display names by estimator class (FlatForest serves a random forest)
+MODEL_LABELS = {"RandomForestRegressor": "Random Forest", "FlatForest": "Random Forest",
+                "HistGradientBoostingRegressor": "Histogram Gradient Boosting",
+                "OnlineRegressor": "Online Linear Model"}
+FEATURE_COLUMNS = ["Distance_km", "Weather", "Traffic_Level", "Time_of_Day", "Vehicle_Type",
+                   "Preparation_Time_min", "Courier_Experience_yrs"]
+
+
+def model_label(model):
+    return MODEL_LABELS.get(type(model).__name__, type(model).__name__)
+
+
+def load_data(path=DATA_PATH):
+    """Orders from a CSV file or a Parquet dataset directory (storage.py)."""
+    if os.path.isdir(path):
+        return read_orders(path)
+    return read_dataset(path)
+
+
+def iter_labelled(path, batch_size=BATCH_SIZE):
+    """Batches of orders with a known delivery time, from a CSV or Parquet directory."""
+    columns = FEATURE_COLUMNS + [TARGET]
+    if os.path.isdir(path):
+        batches = iter_orders(path, columns=columns, batch_size=batch_size)
+    else:
+        batches = iter_batches(path, batch_size=batch_size, columns=columns)
+    for batch in batches:
+        yield batch[batch[TARGET].notna()]
+
+
+def make_encoder(model_type="forest"):
+    encoder = NativeOrderEncoder if model_type == "hgb" else OrderEncoder
+    return encoder(NUMERIC_COLUMNS, CATEGORICAL_COLUMNS)
+
+
+def make_estimator(model_type, encoder, random_state=42, **params):
+    """Unfitted estimator of `model_type` for `encoder`'s feature layout."""
+    if model_type not in MODEL_TYPES:
+        raise ValueError(f"model_type must be one of {MODEL_TYPES}, got {model_type!r}")
+    params.setdefault("random_state", random_state)
+    if model_type == "hgb":
+        params.pop("n_jobs", None)  # threads come from OpenMP
+        return HistGradientBoostingRegressor(categorical_features=encoder.categorical_mask, **params)
+    params.setdefault("n_jobs", -1)
+    return RandomForestRegressor(**params)
+
+
+def evaluate(y_true, pred):
+    """The notebook's metrics: MAE, RMSE and R2."""
+    return {
+        "MAE": float(mean_absolute_error(y_true, pred)),
+        "RMSE": float(np.sqrt(mean_squared_error(y_true, pred))),
+        "R2": float(r2_score(y_true, pred)),
+    }
+
+
+def train_model(df, test_size=0.2, random_state=42, model=None, encoder=None,
+                model_type="forest", **params):
+    """Fit a `model_type` model on `df`; returns `(model, encoder, metrics)`.
+
+    Passing a fitted `model` (with `warm_start=True` and a larger
+    `n_estimators`) together with its `encoder` grows that forest instead
+    of building a new one. New forests use every core unless `n_jobs` is
+    given in `params`.
+    """
+    X_train, X_test, y_train, y_test = train_test_split(
+        df[FEATURE_COLUMNS], df[TARGET], test_size=test_size, random_state=random_state
+    )
+    if encoder is None:
+        encoder = make_encoder(model_type).fit(X_train)
+    if model is None:
+        model = make_estimator(model_type, encoder, random_state, **params)
+    with timed("encode"):
+        X_train, X_test = encoder.transform(X_train), encoder.transform(X_test)
+    with timed("fit"):
+        model.fit(X_train, np.asarray(y_train).ravel())
+
+    with timed("predict"):
+        pred = model.predict(X_test)
+    return model, encoder, evaluate(np.asarray(y_test).ravel(), pred)
+
+
+def save_model(model, encoder, path=MODEL_PATH, **metadata):
+    save_artifact(path, model, encoder.columns, encoder=encoder.to_dict(), **metadata)
+
+
+def artifact_encoder(artifact):
+    """The artifact's encoder, rebuilt from its column layout for old artifacts."""
+    if "encoder" in artifact.metadata:
+        return OrderEncoder.from_dict(artifact.metadata["encoder"])
+    return OrderEncoder.from_columns(artifact.columns, CATEGORICAL_COLUMNS)
+
+
+def load_model(path=MODEL_PATH, flat=False):
+    """Returns `(model, encoder)` saved by save_model().
+
+    With `flat`, a forest is served as a FlatForest over the artifact's
+    memory-mapped arrays and the sklearn estimator is never unpickled;
+    other models are always the estimator.
+    """
+    with timed("model_load"):
+        artifact = load_artifact(path)
+        flat = flat and bool(artifact.arrays)
+        model = FlatForest.from_artifact(artifact) if flat else artifact.estimator
+        return model, artifact_encoder(artifact)
+
+
+def load_or_train(model_path=MODEL_PATH, data_path=DATA_PATH, flat=False):
+    """Load the saved model, training and saving it from the CSV if missing."""
+    if os.path.exists(model_path):
+        return load_model(model_path, flat)
+    if not os.path.exists(data_path):
+        raise FileNotFoundError(f"neither {model_path} nor {data_path} found")
+    model, encoder, metrics = train_model(load_data(data_path))
+    save_model(model, encoder, model_path, metrics=metrics, data_path=data_path)
+    return (FlatForest.from_model(model) if flat else model), encoder
+
+
+def predict(model, encoder, orders):
+    """Predicted delivery minutes for a DataFrame of orders."""
+    with timed("encode"):
+        X = encoder.transform(orders)
+    with timed("predict"):
+        return model.predict(X)
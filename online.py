@@ -0,0 +1,119 @@
+"""Online delivery-time model updated from newly completed orders.
+
+    python online.py --data completed_orders.csv --out online_model
+
+OnlineRegressor is a linear model (SGDRegressor) on the same OrderEncoder
+features as the forest, with numerics standardized by a running
+StandardScaler. Both are updated with partial_fit() one mini-batch at a
+time, so an update costs time proportional to the new orders only and
+memory stays bounded by the batch size. Missing numerics are imputed with
+the running mean.
+
+Each run loads the artifact in --out if there is one and continues from
+it, so new deliveries can be fed in as they arrive. Every batch is scored
+before it is learned from (progressive validation); that running MAE is
+printed and kept in the artifact metadata. The artifact is an ordinary
+one, so app.py and service.py serve it like any other model.
+"""
+import argparse
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+from sklearn.linear_model import SGDRegressor
+from sklearn.preprocessing import StandardScaler
+
+from artifact import load_artifact
+from model import TARGET, artifact_encoder, iter_labelled, make_encoder, save_model
+
+BATCH = 10_000
+
+
+class OnlineRegressor:
+    """Incrementally trained linear model over encoded orders."""
+
+    def __init__(self, n_numeric, random_state=42, **params):
+        self.n_numeric = n_numeric
+        self.scaler = StandardScaler()
+        params.setdefault("average", True)
+        self.regressor = SGDRegressor(random_state=random_state, **params)
+        self.n_seen = 0
+
+    def _scale(self, X):
+        X = np.array(X, dtype=np.float64)
+        numeric = self.scaler.transform(X[:, :self.n_numeric])
+        X[:, :self.n_numeric] = np.nan_to_num(numeric, nan=0.0)
+        return X
+
+    def partial_fit(self, X, y):
+        """Update the scaler and the regressor with one batch of encoded orders."""
+        self.scaler.partial_fit(np.asarray(X, dtype=np.float64)[:, :self.n_numeric])
+        self.regressor.partial_fit(self._scale(X), np.asarray(y, dtype=np.float64))
+        self.n_seen += len(X)
+        return self
+
+    def predict(self, X):
+        return self.regressor.predict(self._scale(X))
+
+
+def update(model, encoder, batches, stats=None):
+    """partial_fit `model` on every batch, scoring each one first.
+
+    `stats` accumulates `rows` and `abs_error` (absolute error summed over
+    the rows that were scored before the model learned from them).
+    """
+    stats = {"rows": 0, "abs_error": 0.0} if stats is None else stats
+    out = np.empty((BATCH, encoder.n_features), dtype=np.float32)
+    for batch in batches:
+        if out.shape[0] < len(batch):
+            out = np.empty((len(batch), encoder.n_features), dtype=np.float32)
+        X = encoder.transform(batch, out=out[:len(batch)])
+        y = batch[TARGET].to_numpy(dtype=np.float64)
+        if model.n_seen:
+            stats["abs_error"] += float(np.abs(model.predict(X) - y).sum())
+            stats["rows"] += len(y)
+        model.partial_fit(X, y)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", required=True, help="new orders: CSV or Parquet directory")
+    parser.add_argument("--out", default="online_model", help="artifact to continue and save")
+    parser.add_argument("--batch-size", type=int, default=BATCH)
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.out):
+        # Not memory-mapped: partial_fit updates the coefficients in place
+        artifact = load_artifact(args.out, mmap_mode=None)
+        model, encoder = artifact.estimator, artifact_encoder(artifact)
+        if not isinstance(model, OnlineRegressor):
+            raise SystemExit(f"{args.out} does not hold an online model")
+    else:
+        # The ingest schema fixes the vocabulary, so one batch fits the encoder
+        first = next(iter_labelled(args.data, args.batch_size), None)
+        if first is None:
+            raise SystemExit(f"no orders in {args.data}")
+        encoder = make_encoder().fit(first)
+        model = OnlineRegressor(len(encoder.numeric))
+
+    seen = model.n_seen
+    stats = update(model, encoder, iter_labelled(args.data, args.batch_size))
+    online = {
+        "rows_seen": model.n_seen,
+        "rows_this_update": model.n_seen - seen,
+        "progressive_mae": stats["abs_error"] / stats["rows"] if stats["rows"] else None,
+        "updated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    save_model(model, encoder, args.out, online=online, data_path=args.data)
+
+    print(f"Rows learned: {online['rows_this_update']:,} (total {online['rows_seen']:,})")
+    if online["progressive_mae"] is not None:
+        print(f"Progressive MAE: {online['progressive_mae']:.4f}")
+
+
+if __name__ == "__main__":
+    # Run through the importable module so the pickled model refers to
+    # online.OnlineRegressor rather than __main__.OnlineRegressor
+    from online import main
+    main()
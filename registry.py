@@ -0,0 +1,181 @@
+"""Persistent restaurant prep-time registry.
+
+    python registry.py observe completed_orders.csv    # restaurant, prep minutes
+    python registry.py show "Pizza Palace"
+
+Per-restaurant preparation-time statistics (count, mean and the sum of
+squared deviations, M2) live in a SQLite table keyed by restaurant name,
+so a lookup is a primary-key probe however many restaurants there are.
+Looked-up values are kept in an in-process dict, so repeated lookups cost
+a dict access plus one `PRAGMA data_version` check, which drops the dict
+whenever another connection (another process, or the CLI) has committed.
+
+observe() folds a batch of observed prep times into the table without
+reading the old rows: the batch is reduced to count/mean/M2 per
+restaurant and merged into the stored values by one UPSERT using the
+parallel form of Welford's update (Chan et al.). Restaurants can be
+seeded with a prior mean and a count of 0, which the first observation
+replaces.
+"""
+import argparse
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from scoring import DEFAULT_PREP_TIME, PREP_TIMES
+
+REGISTRY_PATH = "restaurants.sqlite"
+CHUNK_SIZE = 100_000
+# SQLite's default limit on bound parameters is 999 in older builds
+MAX_PARAMS = 900
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS restaurants (
+    name TEXT PRIMARY KEY,
+    n INTEGER NOT NULL,
+    mean REAL NOT NULL,
+    m2 REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+MERGE = """
+INSERT INTO restaurants (name, n, mean, m2) VALUES (?, ?, ?, ?)
+ON CONFLICT (name) DO UPDATE SET
+    n = restaurants.n + excluded.n,
+    mean = restaurants.mean + (excluded.mean - restaurants.mean) * excluded.n
+           / (restaurants.n + excluded.n),
+    m2 = restaurants.m2 + excluded.m2 + (excluded.mean - restaurants.mean)
+         * (excluded.mean - restaurants.mean) * restaurants.n * excluded.n
+         / (restaurants.n + excluded.n)
+"""
+
+
+class PrepTimeRegistry:
+    """SQLite-backed per-restaurant prep-time statistics with a lookup cache."""
+
+    def __init__(self, path=REGISTRY_PATH):
+        self.path = path
+        # Shared by the threads of the app and the service, behind one lock
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._cache = {}
+        with self._lock, self._db:
+            self._db.execute(SCHEMA)
+        self._version = self._data_version()
+
+    def _data_version(self):
+        return self._db.execute("PRAGMA data_version").fetchone()[0]
+
+    def _check_version(self):
+        # data_version changes only on commits by other connections; ours clear the cache themselves
+        version = self._data_version()
+        if version != self._version:
+            self._cache.clear()
+            self._version = version
+
+    def close(self):
+        self._db.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM restaurants").fetchone()[0]
+
+    def seed(self, prep_times):
+        """Add restaurants with a prior mean (count 0) unless already present."""
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO restaurants (name, n, mean, m2) VALUES (?, 0, ?, 0)",
+                [(name, float(minutes)) for name, minutes in prep_times.items()])
+            self._cache.clear()
+
+    def observe(self, restaurants, prep_times):
+        """Fold observed prep minutes (aligned with `restaurants`) into the statistics."""
+        batch = pd.DataFrame({"name": np.asarray(restaurants, dtype=object),
+                              "x": np.asarray(prep_times, dtype=np.float64)}).dropna()
+        if batch.empty:
+            return 0
+        groups = batch.groupby("name", sort=False)["x"]
+        stats = groups.agg(["count", "mean"])
+        stats["m2"] = groups.var(ddof=0) * stats["count"]
+        rows = [(name, int(n), float(mean), float(m2))
+                for name, n, mean, m2 in stats.itertuples()]
+        with self._lock, self._db:
+            self._db.executemany(MERGE, rows)
+            for name in stats.index:
+                self._cache.pop(name, None)
+        return len(batch)
+
+    def _fetch(self, names):
+        # Cache the stored stats (or None) of every name in one query per chunk
+        for start in range(0, len(names), MAX_PARAMS):
+            chunk = names[start:start + MAX_PARAMS]
+            found = dict.fromkeys(chunk)
+            query = ("SELECT name, n, mean, m2 FROM restaurants WHERE name IN (%s)"
+                     % ",".join("?" * len(chunk)))
+            for name, n, mean, m2 in self._db.execute(query, chunk):
+                found[name] = (n, mean, m2)
+            self._cache.update(found)
+
+    def stats(self, name):
+        """`{"n", "mean", "std"}` for one restaurant, or None if unknown."""
+        with self._lock:
+            self._check_version()
+            if name not in self._cache:
+                self._fetch([name])
+            entry = self._cache[name]
+        if entry is None:
+            return None
+        n, mean, m2 = entry
+        return {"n": n, "mean": mean, "std": float(np.sqrt(m2 / n)) if n else None}
+
+    def prep_time(self, name, default=DEFAULT_PREP_TIME):
+        stats = self.stats(name)
+        return default if stats is None else stats["mean"]
+
+    def prep_times(self, restaurants, default=DEFAULT_PREP_TIME):
+        """Vectorized prep_time() for an array of restaurant names."""
+        names = pd.Series(np.asarray(restaurants, dtype=object).ravel())
+        unique = names.dropna().unique().tolist()
+        with self._lock:
+            self._check_version()
+            self._fetch([name for name in unique if name not in self._cache])
+            means = {name: self._cache[name][1] for name in unique if self._cache[name] is not None}
+        return names.map(means).fillna(default).to_numpy(dtype=np.float64)
+
+
+def open_registry(path=REGISTRY_PATH, seed=PREP_TIMES):
+    """Open (creating if needed) the registry, seeded with `seed` when empty."""
+    registry = PrepTimeRegistry(path)
+    if seed and not len(registry):
+        registry.seed(seed)
+    return registry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Restaurant prep-time registry")
+    parser.add_argument("--db", default=REGISTRY_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    observe = commands.add_parser("observe", help="fold a CSV of observed prep times in")
+    observe.add_argument("csv")
+    observe.add_argument("--restaurant-column", default="restaurant")
+    observe.add_argument("--prep-column", default="prep_time")
+    show = commands.add_parser("show", help="print one restaurant's statistics")
+    show.add_argument("name")
+    args = parser.parse_args(argv)
+
+    registry = open_registry(args.db)
+    if args.command == "observe":
+        rows = 0
+        columns = [args.restaurant_column, args.prep_column]
+        for chunk in pd.read_csv(args.csv, usecols=columns, chunksize=CHUNK_SIZE):
+            rows += registry.observe(chunk[args.restaurant_column], chunk[args.prep_column])
+        print(f"Observed {rows:,} prep times; {len(registry):,} restaurants in {args.db}")
+    else:
+        print(registry.stats(args.name))
+    registry.close()
+
+
+if __name__ == "__main__":
+    main()
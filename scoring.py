@@ -0,0 +1,194 @@
+"""Table-driven delivery-time scoring.
+
+This is the heuristic formula behind app.py, lifted out of the Streamlit
+script so it can score one order or millions of orders in a single
+vectorized pass. Every categorical effect lives in a lookup table below;
+inputs may be plain strings, arrays of strings or integer category codes
+(positions in the table's key order).
+"""
+import numpy as np
+import pandas as pd
+
+# ---------------- Effect tables ----------------
+# Minutes added per km of distance
+TRAFFIC_PER_KM = {"Low": 0.0, "Medium": 0.05, "High": 0.1}
+WEATHER_PER_KM = {"Clear": 0.0, "Cloudy": 0.02, "Rainy": 0.05, "Stormy": 0.15}
+VEHICLE_PER_KM = {"Bike": 0.0, "EV": -0.03, "Drone": -0.06}
+
+# Flat minutes added
+TIME_OF_DAY_MINUTES = {"Morning": 0.0, "Lunch": 10.0, "Evening": 15.0, "Night": 5.0}
+
+# Applied to the total
+URGENCY_MULTIPLIER = {"Normal": 1.0, "Express": 0.85, "Priority": 0.7}
+
+TRAFFIC_LEVELS = list(TRAFFIC_PER_KM)
+WEATHER_CONDITIONS = list(WEATHER_PER_KM)
+VEHICLE_TYPES = list(VEHICLE_PER_KM)
+TIMES_OF_DAY = list(TIME_OF_DAY_MINUTES)
+URGENCY_LEVELS = list(URGENCY_MULTIPLIER)
+
+BASE_MINUTES_PER_KM = 3.0
+FESTIVAL_MINUTES = 20.0
+EXTREME_PER_KM = 0.2
+EXTREME_MAX_DELAY = 30  # extra minutes drawn from [0, 30)
+MAX_MINUTES = 2000.0
+
+DEFAULT_PREP_TIME = 10
+PREP_TIMES = {"Pizza Palace": 10, "Burger Hub": 8, "Sushi World": 12, "Dessert Cafe": 6}
+
+# Column order of the contribution matrix returned by score()
+FACTORS = ["Base Time", "Traffic", "Weather", "Vehicle", "Festival", "Time of Day", "Extreme Mode"]
+PREDICTION_COLUMN = "Predicted Time (min)"
+
+
+def _table_values(table):
+    return np.fromiter(table.values(), dtype=np.float64, count=len(table))
+
+
+def category_codes(table, values):
+    """Map labels (or pass through integer codes) to positions in `table`."""
+    values = np.asarray(values)
+    if values.dtype.kind in "iu":
+        codes = values.astype(np.intp, copy=False)
+        if codes.size and (codes.min() < 0 or codes.max() >= len(table)):
+            raise ValueError(f"category code out of range for {list(table)}")
+        return codes
+    codes = pd.Categorical(values.ravel(), categories=list(table)).codes
+    if (codes < 0).any():
+        unknown = sorted(set(values.ravel()[codes < 0].tolist()), key=str)
+        raise ValueError(f"unknown categories {unknown}, expected one of {list(table)}")
+    return codes.astype(np.intp).reshape(values.shape)
+
+
+def lookup(table, values):
+    """Vectorized `table[value]` for labels or integer codes."""
+    return _table_values(table)[category_codes(table, values)]
+
+
+def prep_time_for(restaurants, prep_times=None, default=DEFAULT_PREP_TIME):
+    """Preparation minutes per restaurant name, falling back to `default`."""
+    prep_times = PREP_TIMES if prep_times is None else prep_times
+    names = pd.Series(np.asarray(restaurants, dtype=object).ravel())
+    return names.map(prep_times).fillna(default).to_numpy(dtype=np.float64)
+
+
+def draw_extreme_delay(size=None, rng=None):
+    """Random extra minutes used by Extreme Mode."""
+    rng = np.random.default_rng(rng)
+    return rng.integers(0, EXTREME_MAX_DELAY, size=size)
+
+
+def _effects(distance, traffic, weather, vehicle, time_of_day, festival, prep_time,
+             extreme_delay):
+    # Each factor's minutes in FACTORS order, computed only when consumed
+    yield np.asarray(prep_time, dtype=np.float64) + distance * BASE_MINUTES_PER_KM
+    yield distance * lookup(TRAFFIC_PER_KM, traffic)
+    yield distance * lookup(WEATHER_PER_KM, weather)
+    yield distance * lookup(VEHICLE_PER_KM, vehicle)
+    yield np.where(np.asarray(festival, dtype=bool), FESTIVAL_MINUTES, 0.0)
+    yield lookup(TIME_OF_DAY_MINUTES, time_of_day)
+    if extreme_delay is None:
+        yield np.zeros(())
+    else:
+        extreme_delay = np.asarray(extreme_delay, dtype=np.float64)
+        yield np.where(np.isnan(extreme_delay), 0.0, distance * EXTREME_PER_KM + extreme_delay)
+
+
+def score(distance, traffic, weather, vehicle, time_of_day, urgency="Normal",
+          festival=False, prep_time=DEFAULT_PREP_TIME, extreme_delay=None):
+    """Score orders with the app.py formula.
+
+    All arguments broadcast against each other. `extreme_delay` turns on
+    Extreme Mode when given (see draw_extreme_delay); NaN entries leave it
+    off for those orders. Returns
+    `(predicted, contributions)`: the capped prediction in minutes and an
+    array of shape `predicted.shape + (len(FACTORS),)` holding each
+    factor's minutes before the urgency multiplier.
+    """
+    distance = np.asarray(distance, dtype=np.float64)
+    parts = np.broadcast_arrays(*_effects(distance, traffic, weather, vehicle, time_of_day,
+                                          festival, prep_time, extreme_delay))
+    contributions = np.stack(parts, axis=-1)
+    predicted = contributions.sum(axis=-1) * lookup(URGENCY_MULTIPLIER, urgency)
+    predicted = np.minimum(predicted, MAX_MINUTES)
+    return predicted, contributions
+
+
+def predict_minutes(distance, traffic, weather, vehicle, time_of_day, urgency="Normal",
+                    festival=False, prep_time=DEFAULT_PREP_TIME, extreme_delay=None):
+    """score()'s capped prediction alone, without the contribution matrix.
+
+    Factors are added into one output array as they are computed, so
+    memory stays at a few arrays of the output's size.
+    """
+    arguments = (distance, traffic, weather, vehicle, time_of_day, urgency, festival, prep_time,
+                 extreme_delay)
+    predicted = np.zeros(np.broadcast_shapes(*(np.shape(a) for a in arguments if a is not None)))
+    distance = np.asarray(distance, dtype=np.float64)
+    for effect in _effects(distance, traffic, weather, vehicle, time_of_day, festival, prep_time,
+                           extreme_delay):
+        predicted += effect
+    predicted *= lookup(URGENCY_MULTIPLIER, urgency)
+    return np.minimum(predicted, MAX_MINUTES, out=predicted)
+
+
+# DataFrame columns read by score_orders(), named after score()'s arguments
+ORDER_COLUMNS = ["distance", "traffic", "weather", "vehicle", "time_of_day",
+                 "urgency", "festival", "prep_time", "extreme_delay"]
+# score()'s defaults for the optional columns, used for missing (NaN) cells
+OPTIONAL_DEFAULTS = {"urgency": "Normal", "festival": False, "prep_time": DEFAULT_PREP_TIME}
+
+
+def festival_flags(values):
+    """`values` as a bool array; only booleans and 0/1 are accepted."""
+    values = pd.Series(np.asarray(values, dtype=object).ravel())
+    invalid = ~values.isin([True, False])
+    if invalid.any():
+        unknown = sorted(set(values[invalid].tolist()), key=str)
+        raise ValueError(f"festival must be true/false or 1/0, got {unknown}")
+    return values.astype(bool).to_numpy()
+
+
+def score_orders(orders, registry=None, **defaults):
+    """Score a DataFrame of orders.
+
+    Columns are named after score()'s arguments; optional ones that are
+    missing, or missing cells in them, are taken from `defaults` or
+    score()'s own defaults, so every order scores as it would alone. A
+    `restaurant` column supplies the prep time of orders without one, from
+    `registry` (a registry.PrepTimeRegistry) if given, else from
+    PREP_TIMES. Raises ValueError for a missing or non-finite distance and
+    for festival values other than booleans and 0/1. Returns a DataFrame
+    with one column per factor and the prediction, aligned to the input
+    index.
+    """
+    fill = {**OPTIONAL_DEFAULTS, **defaults}
+    kwargs = dict(defaults)
+    for column in ORDER_COLUMNS:
+        if column in orders:
+            values = orders[column]
+            if column in OPTIONAL_DEFAULTS:
+                values = values.where(values.notna(), fill[column])
+            kwargs[column] = values.to_numpy()
+    if "distance" in orders:
+        distance = orders["distance"].to_numpy(dtype=np.float64, na_value=np.nan)
+        if not np.isfinite(distance).all():
+            raise ValueError("distance must be a finite number for every order")
+        kwargs["distance"] = distance
+    if "festival" in kwargs:
+        kwargs["festival"] = festival_flags(kwargs["festival"])
+    if "restaurant" in orders and ("prep_time" not in orders or orders["prep_time"].isna().any()):
+        restaurants = orders["restaurant"]
+        if registry is None:
+            prep_time = prep_time_for(restaurants, default=fill["prep_time"])
+        else:
+            prep_time = registry.prep_times(restaurants, default=fill["prep_time"])
+        if "prep_time" in orders:
+            given = orders["prep_time"].to_numpy(dtype=np.float64, na_value=np.nan)
+            prep_time = np.where(np.isnan(given), prep_time, given)
+        kwargs["prep_time"] = prep_time
+    predicted, contributions = score(**kwargs)
+    result = pd.DataFrame(np.broadcast_to(contributions, (len(orders), len(FACTORS))),
+                          columns=FACTORS, index=orders.index)
+    result[PREDICTION_COLUMN] = np.broadcast_to(predicted, len(orders))
+    return result
@@ -0,0 +1,228 @@
+"""Local HTTP prediction service with micro-batching.
+
+    python service.py --model delivery_model --port 8000
+
+Endpoints (JSON in and out):
+
+- `POST /predict`: trained model, or its precomputed grid with --grid
+  (see grid.py); orders use the dataset's columns (Distance_km, Weather,
+  Traffic_Level, ...).
+- `POST /estimate`: the app.py formula; orders use scoring.py's argument
+  names (distance, traffic, weather, ...).
+- `GET /health`
+- `GET /metrics`: stage timings and request counters (instrument.py) in
+  Prometheus text format
+
+A request body is one order object or a list of them; the response is
+`{"predictions": [...]}` in the same order. Concurrent requests are queued
+and scored together: a batch is closed when it holds `max_batch_size`
+orders or when `max_wait_ms` has passed since its first request, then
+scored with a single vectorized call.
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from grid import PredictionGrid
+from instrument import METRICS, count, timed
+from model import FEATURE_COLUMNS, MODEL_PATH, load_model
+from registry import REGISTRY_PATH, open_registry
+from scoring import PREDICTION_COLUMN, score_orders
+
+MAX_BATCH_SIZE = 64
+MAX_WAIT_MS = 2.0
+REQUEST_TIMEOUT = 30.0
+
+
+class MicroBatcher:
+    """Collects concurrent submissions and scores them in one call.
+
+    `score_batch` takes a list of orders and returns one prediction per
+    order. If a batch fails, its requests are retried one by one so a
+    single bad request does not fail its neighbours.
+    """
+
+    def __init__(self, score_batch, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, orders):
+        """Queue a list of orders; returns a Future of their predictions."""
+        future = Future()
+        self._queue.put((orders, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            orders = [order for item, _ in batch for order in item]
+            try:
+                predictions = list(self.score_batch(orders))
+            except Exception:
+                for item, future in batch:
+                    self._score_alone(item, future)
+                continue
+            start = 0
+            for item, future in batch:
+                future.set_result(predictions[start:start + len(item)])
+                start += len(item)
+
+    def _score_alone(self, orders, future):
+        try:
+            future.set_result(list(self.score_batch(orders)))
+        except Exception as e:
+            future.set_exception(e)
+
+
+def heuristic_scorer(registry=None):
+    def score_batch(orders):
+        with timed("formula"):
+            return score_orders(pd.DataFrame(orders), registry)[PREDICTION_COLUMN].tolist()
+    return score_batch
+
+
+def model_scorer(model, encoder):
+    def score_batch(orders):
+        with timed("encode"):
+            X = np.empty((len(orders), encoder.n_features), dtype=np.float32)
+            for i, order in enumerate(orders):
+                encoder.encode_row(order, out=X[i])
+        with timed("predict"):
+            return model.predict(X).tolist()
+    return score_batch
+
+
+def grid_scorer(grid):
+    def score_batch(orders):
+        with timed("grid_predict"):
+            return grid.predict({c: [order.get(c) for order in orders] for c in FEATURE_COLUMNS}).tolist()
+    return score_batch
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    # Set by make_server(): path -> MicroBatcher (None if unavailable)
+    batchers = {}
+
+    def _send(self, status, body, content_type="application/json"):
+        data = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok",
+                             "endpoints": {p: b is not None for p, b in self.batchers.items()}})
+        elif self.path == "/metrics":
+            self._send(200, METRICS.to_prometheus(), "text/plain; version=0.0.4")
+        else:
+            self._send(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path not in self.batchers:
+            return self._send(404, {"error": f"unknown path {self.path}"})
+        batcher = self.batchers[self.path]
+        if batcher is None:
+            return self._send(503, {"error": "no trained model loaded"})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError as e:
+            return self._send(400, {"error": f"invalid JSON: {e}"})
+        orders = body if isinstance(body, list) else [body]
+        if not orders or not all(isinstance(order, dict) for order in orders):
+            return self._send(400, {"error": "expected an order object or a list of them"})
+        try:
+            predictions = batcher.submit(orders).result(timeout=REQUEST_TIMEOUT)
+        except TimeoutError:
+            return self._send(504, {"error": "prediction timed out"})
+        except (ValueError, KeyError, TypeError) as e:
+            return self._send(400, {"error": str(e)})
+        count("requests")
+        count("orders", len(orders))
+        self._send(200, {"predictions": predictions})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PredictionServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Default listen backlog (5) resets connections under bursts of clients
+    request_queue_size = 1024
+
+
+def make_server(host="127.0.0.1", port=8000, model_path=MODEL_PATH,
+                max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, grid_path=None,
+                registry_path=REGISTRY_PATH):
+    try:
+        if grid_path:
+            scorer = grid_scorer(PredictionGrid.load(grid_path))
+        else:
+            scorer = model_scorer(*load_model(model_path, flat=True))
+        model_batcher = MicroBatcher(scorer, max_batch_size, max_wait_ms)
+    except FileNotFoundError:
+        model_batcher = None
+    estimate_batcher = MicroBatcher(heuristic_scorer(open_registry(registry_path)), max_batch_size,
+                                    max_wait_ms)
+    handler = type("Handler", (PredictionHandler,), {"batchers": {
+        "/predict": model_batcher,
+        "/estimate": estimate_batcher,
+    }})
+    return PredictionServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-batching delivery-time prediction service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model", default=MODEL_PATH, help="artifact directory")
+    parser.add_argument("--grid", help="serve /predict from this precomputed grid directory")
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    parser.add_argument("--registry", default=REGISTRY_PATH,
+                        help="restaurant prep-time registry for /estimate")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.model, args.max_batch_size, args.max_wait_ms,
+                         args.grid, args.registry)
+    print(f"Serving on http://{args.host}:{args.port} "
+          f"(max batch {args.max_batch_size}, max wait {args.max_wait_ms} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
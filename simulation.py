@@ -0,0 +1,80 @@
+"""Vectorized Monte Carlo scenarios for the delivery-time formula.
+
+Scenarios are sampled as whole arrays (categoricals as integer codes into
+the scoring.py tables) and scored in a single scoring.predict_minutes()
+call, so a million scenarios cost a few NumPy passes instead of a Python
+loop, without building the per-factor contribution matrix.
+"""
+import numpy as np
+import pandas as pd
+
+from scoring import (DEFAULT_PREP_TIME, PREDICTION_COLUMN, TIMES_OF_DAY, TRAFFIC_LEVELS,
+                     VEHICLE_TYPES, WEATHER_CONDITIONS, draw_extreme_delay, predict_minutes)
+
+DISTANCE_RANGE = (0.1, 100.0)
+PERCENTILES = (50, 90, 99)
+
+# Sampled column -> category labels (None for non-categorical columns)
+SCENARIO_COLUMNS = {
+    "Distance (km)": None,
+    "Traffic": TRAFFIC_LEVELS,
+    "Weather": WEATHER_CONDITIONS,
+    "Vehicle": VEHICLE_TYPES,
+    "Festival": None,
+    "Time of Day": TIMES_OF_DAY,
+}
+
+
+def sample_scenarios(n, rng=None, prep_time=DEFAULT_PREP_TIME, urgency="Normal",
+                     extreme=False, distance_range=DISTANCE_RANGE):
+    """Draw and score `n` random scenarios.
+
+    Distance is uniform over `distance_range` (rounded to 0.01 km) and every
+    categorical is uniform over its table. Returns a dict of equal-length
+    arrays keyed by SCENARIO_COLUMNS plus PREDICTION_COLUMN; categoricals
+    are int8 codes.
+    """
+    rng = np.random.default_rng(rng)
+    low, high = distance_range
+    scenarios = {}
+    for column, labels in SCENARIO_COLUMNS.items():
+        if column == "Distance (km)":
+            scenarios[column] = np.round(rng.uniform(low, high, n), 2)
+        elif column == "Festival":
+            scenarios[column] = rng.random(n) < 0.5
+        else:
+            scenarios[column] = rng.integers(0, len(labels), n, dtype=np.int8)
+    extreme_delay = draw_extreme_delay(n, rng) if extreme else None
+
+    predicted = predict_minutes(scenarios["Distance (km)"], scenarios["Traffic"],
+                                scenarios["Weather"], scenarios["Vehicle"],
+                                scenarios["Time of Day"], urgency, festival=scenarios["Festival"],
+                                prep_time=prep_time, extreme_delay=extreme_delay)
+    scenarios[PREDICTION_COLUMN] = np.round(predicted, 2)
+    return scenarios
+
+
+def scenario_frame(scenarios, limit=None):
+    """Labelled DataFrame of the first `limit` scenarios (all by default)."""
+    columns = {}
+    for column, values in scenarios.items():
+        values = values[:limit]
+        labels = SCENARIO_COLUMNS.get(column)
+        columns[column] = values if labels is None else pd.Categorical.from_codes(values, labels)
+    return pd.DataFrame(columns)
+
+
+def summarize(times, percentiles=PERCENTILES):
+    """Min/mean/max and the requested percentiles of simulated times."""
+    times = np.asarray(times)
+    summary = {"min": times.min(), "mean": times.mean(), "max": times.max()}
+    for q, value in zip(percentiles, np.percentile(times, percentiles)):
+        summary[f"p{q}"] = value
+    return {key: float(value) for key, value in summary.items()}
+
+
+def histogram(times, bins=50):
+    """Counts per bin, indexed by the bin's left edge in minutes."""
+    counts, edges = np.histogram(times, bins=bins)
+    return pd.DataFrame({"Scenarios": counts},
+                        index=pd.Index(np.round(edges[:-1], 1), name=PREDICTION_COLUMN))
@@ -0,0 +1,178 @@
+"""Partitioned Parquet storage for the order history.
+
+    python storage.py Food_Delivery_Times.csv --out orders_parquet
+    python storage.py synthetic_orders/*.csv --out orders_parquet --partition Traffic_Level Weather
+
+write_orders() streams CSVs through ingest.iter_batches() into a Hive-
+partitioned Parquet dataset (`Traffic_Level=High/part-<write id>-0.parquet`,
+...). Each write appends new files, so later batches of orders add to the
+history instead of replacing it; writing with a different partition
+layout than the existing dataset is refused unless `overwrite` replaces
+the whole dataset.
+Categoricals are stored dictionary-encoded and numerics keep ingest's
+compact dtypes. If a DataFrame of orders has a DATE_COLUMN, a `month`
+partition (YYYY-MM) is added in front of the others; the notebook's CSV
+has no date (and CSVs only carry ingest.SCHEMA columns), so by default
+only Traffic_Level is partitioned.
+
+read_orders() / iter_orders() read back only the requested columns, and
+`filters` such as `{"Traffic_Level": "High"}` or `{"month": ["2024-01"]}`
+are pushed down to skip whole partitions and, for other columns, Parquet
+row groups whose min/max statistics cannot match.
+"""
+import argparse
+import os
+import shutil
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from ingest import BATCH_SIZE, SCHEMA, iter_batches
+
+DATE_COLUMN = "Order_Date"
+MONTH_COLUMN = "month"
+PARTITION_COLUMNS = ["Traffic_Level"]
+ROW_GROUP_SIZE = 1_000_000
+
+
+def _arrow_type(dtype):
+    if isinstance(dtype, pd.CategoricalDtype):
+        return pa.dictionary(pa.int8(), pa.string())
+    return pa.from_numpy_dtype(dtype)
+
+
+ARROW_SCHEMA = pa.schema([(column, _arrow_type(dtype)) for column, dtype in SCHEMA.items()])
+
+
+def _with_month(orders):
+    if DATE_COLUMN not in orders:
+        return orders
+    dates = pd.to_datetime(orders[DATE_COLUMN])
+    return orders.assign(**{MONTH_COLUMN: dates.dt.strftime("%Y-%m")})
+
+
+def _record_batches(frames, schema):
+    for frame in frames:
+        yield pa.RecordBatch.from_pandas(_with_month(frame), schema=schema, preserve_index=False)
+
+
+def existing_partitioning(path):
+    """Partition columns of the dataset at `path`, or None if it holds no files."""
+    for root, _, names in os.walk(path):
+        if any(name.endswith(".parquet") for name in names):
+            relative = os.path.relpath(root, path)
+            return [] if relative == "." else [part.split("=")[0]
+                                               for part in relative.split(os.sep)]
+    return None
+
+
+def write_orders(source, path, partition_cols=None, batch_size=BATCH_SIZE, overwrite=False):
+    """Append orders to the partitioned Parquet dataset at `path`.
+
+    `source` is a DataFrame or one or more CSV paths (read in batches).
+    `partition_cols` defaults to PARTITION_COLUMNS, preceded by `month`
+    when the orders have a DATE_COLUMN. With `overwrite`, an existing
+    dataset is deleted first.
+    """
+    if isinstance(source, pd.DataFrame):
+        frames = [source]
+        columns = list(source.columns)
+    else:
+        paths = [source] if isinstance(source, str) else list(source)
+        frames = (batch for p in paths for batch in iter_batches(p, batch_size))
+        header = pd.read_csv(paths[0], nrows=0).columns
+        columns = [c for c in SCHEMA if c in header]
+
+    fields = [ARROW_SCHEMA.field(c) if c in SCHEMA else pa.field(c, pa.timestamp("us"))
+              for c in columns if c in SCHEMA or c == DATE_COLUMN]
+    if DATE_COLUMN in columns:
+        fields.append(pa.field(MONTH_COLUMN, pa.string()))
+    schema = pa.schema(fields)
+    if partition_cols is None:
+        partition_cols = ([MONTH_COLUMN] if DATE_COLUMN in columns else []) + PARTITION_COLUMNS
+    if overwrite and os.path.exists(path):
+        shutil.rmtree(path)
+    existing = existing_partitioning(path)
+    if existing is not None and existing != list(partition_cols):
+        raise ValueError(f"{path} is partitioned by {existing}, not {list(partition_cols)}; "
+                         "write to a new directory or overwrite it")
+
+    ds.write_dataset(
+        _record_batches(frames, schema), path, schema=schema, format="parquet",
+        partitioning=partition_cols, partitioning_flavor="hive",
+        file_options=ds.ParquetFileFormat().make_write_options(use_dictionary=True,
+                                                               compression="zstd"),
+        max_rows_per_group=ROW_GROUP_SIZE, existing_data_behavior="overwrite_or_ignore",
+        # Unique per write, so appending never replaces earlier files
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+    )
+
+
+def _filter_expression(filters):
+    if filters is None or isinstance(filters, ds.Expression):
+        return filters
+    expression = None
+    for column, values in filters.items():
+        values = values if isinstance(values, (list, tuple, set)) else [values]
+        condition = ds.field(column).isin(list(values))
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def open_orders(path):
+    return ds.dataset(path, format="parquet", partitioning="hive")
+
+
+def _to_frame(table):
+    orders = table.to_pandas()
+    # Partition columns come back as plain strings and dictionaries in
+    # file order; restore the schema dtypes, categories and column order
+    for column in orders.columns.intersection(list(SCHEMA)):
+        dtype = SCHEMA[column]
+        if isinstance(dtype, pd.CategoricalDtype):
+            orders[column] = pd.Categorical(orders[column], dtype=dtype)
+        else:
+            orders[column] = orders[column].astype(dtype)
+    order = [c for c in SCHEMA if c in orders] + [c for c in orders if c not in SCHEMA]
+    return orders[order]
+
+
+def iter_orders(path, columns=None, filters=None, batch_size=BATCH_SIZE):
+    """Yield DataFrames of at most `batch_size` matching orders."""
+    dataset = open_orders(path)
+    for batch in dataset.to_batches(columns=columns, filter=_filter_expression(filters),
+                                    batch_size=batch_size):
+        if batch.num_rows:
+            yield _to_frame(pa.Table.from_batches([batch]))
+
+
+def read_orders(path, columns=None, filters=None):
+    """Matching orders as one DataFrame with ingest.SCHEMA dtypes.
+
+    `filters` maps a column to a value or list of values (combined with
+    AND), or is a pyarrow.dataset expression.
+    """
+    table = open_orders(path).to_table(columns=columns, filter=_filter_expression(filters))
+    return _to_frame(table)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert order CSVs to partitioned Parquet")
+    parser.add_argument("csv", nargs="+", help="CSV file(s) with the dataset's columns")
+    parser.add_argument("--out", default="orders_parquet")
+    parser.add_argument("--partition", nargs="*", help=f"partition columns (default {PARTITION_COLUMNS})")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="replace an existing dataset instead of appending to it")
+    args = parser.parse_args(argv)
+
+    write_orders(args.csv, args.out, args.partition, overwrite=args.overwrite)
+    csv_bytes = sum(os.path.getsize(p) for p in args.csv)
+    parquet_bytes = sum(os.path.getsize(os.path.join(root, name))
+                        for root, _, names in os.walk(args.out) for name in names)
+    print(f"CSV: {csv_bytes / 2**20:.1f} MB -> Parquet: {parquet_bytes / 2**20:.1f} MB in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Grid sweeps of the delivery-time formula.
+
+sweep_grid() evaluates scoring.score() over the full
+distance x traffic x weather x vehicle x time-of-day product in one
+broadcast: each input is laid out along its own axis, so the grid is
+never built as a list of rows.
+"""
+import numpy as np
+import pandas as pd
+
+from scoring import (DEFAULT_PREP_TIME, PREDICTION_COLUMN, TIMES_OF_DAY, TRAFFIC_LEVELS,
+                     VEHICLE_TYPES, WEATHER_CONDITIONS, score)
+
+DISTANCE_AXIS = "Distance (km)"
+FACTOR_AXES = {
+    "Traffic": TRAFFIC_LEVELS,
+    "Weather": WEATHER_CONDITIONS,
+    "Vehicle": VEHICLE_TYPES,
+    "Time of Day": TIMES_OF_DAY,
+}
+SWEEP_AXES = [DISTANCE_AXIS] + list(FACTOR_AXES)
+
+
+def distance_range(start=0.5, stop=50.0, num=200):
+    return np.linspace(start, stop, num)
+
+
+def sweep_grid(distances, factors=None, urgency="Normal", festival=False,
+               prep_time=DEFAULT_PREP_TIME, extreme_delay=None):
+    """Predicted minutes over the distance x factor product.
+
+    `factors` maps each name in FACTOR_AXES to the labels to sweep (all of
+    them by default). Returns `(grid, axes)`: an array with one dimension
+    per entry of SWEEP_AXES, and a dict of the labels along each one.
+    """
+    axes = {DISTANCE_AXIS: np.asarray(distances, dtype=np.float64)}
+    for name, labels in FACTOR_AXES.items():
+        axes[name] = list((factors or {}).get(name, labels))
+
+    ndim = len(SWEEP_AXES)
+    shaped = []
+    for i, (name, values) in enumerate(axes.items()):
+        shape = [1] * ndim
+        shape[i] = len(values)
+        shaped.append(np.asarray(values).reshape(shape))
+    distance, traffic, weather, vehicle, time_of_day = shaped
+
+    grid, _ = score(distance, traffic, weather, vehicle, time_of_day, urgency,
+                    festival=festival, prep_time=prep_time, extreme_delay=extreme_delay)
+    return np.broadcast_to(grid, tuple(len(v) for v in axes.values())), axes
+
+
+def grid_frame(grid, axes, fixed=None):
+    """Long-format DataFrame of a sweep, one row per grid cell.
+
+    `fixed` pins axes to a single label (e.g. `{"Weather": "Rainy"}`); the
+    pinned axes are dropped from the result.
+    """
+    fixed = fixed or {}
+    index = []
+    kept = {}
+    for name, values in axes.items():
+        if name in fixed:
+            index.append(list(values).index(fixed[name]))
+        else:
+            index.append(slice(None))
+            kept[name] = values
+    selected = grid[tuple(index)]
+    frame = pd.MultiIndex.from_product(list(kept.values()), names=list(kept)).to_frame(index=False)
+    frame[PREDICTION_COLUMN] = selected.ravel()
+    return frame
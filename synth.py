@@ -0,0 +1,117 @@
+"""Synthetic Food_Delivery_Times-shaped orders for scale testing.
+
+    python synth.py --rows 100_000_000 --out synthetic_orders --seed 0
+
+Delivery times come from the app.py formula (scoring.score) applied to
+the dataset's categories, mapped onto the nearest app category below, plus
+a courier-experience effect and Gaussian noise. A fraction of the
+Weather, Traffic_Level, Time_of_Day and Courier_Experience_yrs values is
+blanked out after scoring, as in the real data.
+
+Rows are written as CSV shards of --shard-size rows by a process pool.
+Shard i always gets the i-th child of SeedSequence(seed) and the Order_IDs
+starting at i * shard_size + 1, so the output depends only on the seed,
+row count and shard size, not on the number of workers.
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from ingest import CATEGORIES, SCHEMA
+from scoring import TIMES_OF_DAY, TRAFFIC_LEVELS, VEHICLE_TYPES, WEATHER_CONDITIONS, score
+
+SHARD_SIZE = 1_000_000
+NOISE_MINUTES = 5.0
+MISSING_RATE = 0.03
+EXPERIENCE_MINUTES_PER_YEAR = -0.5
+
+# Dataset label -> app.py label whose effect it takes
+CATEGORY_MAP = {
+    "Weather": {"Clear": "Clear", "Rainy": "Rainy", "Snowy": "Stormy", "Foggy": "Cloudy",
+                "Windy": "Cloudy"},
+    "Traffic_Level": {"Low": "Low", "Medium": "Medium", "High": "High"},
+    "Time_of_Day": {"Morning": "Morning", "Afternoon": "Lunch", "Evening": "Evening",
+                    "Night": "Night"},
+    # The app has no car; it gets the bike's (zero) per-km effect
+    "Vehicle_Type": {"Bike": "Bike", "Scooter": "EV", "Car": "Bike"},
+}
+APP_LABELS = {"Weather": WEATHER_CONDITIONS, "Traffic_Level": TRAFFIC_LEVELS,
+              "Time_of_Day": TIMES_OF_DAY, "Vehicle_Type": VEHICLE_TYPES}
+# Dataset category code -> app category code
+CODE_MAP = {column: np.array([APP_LABELS[column].index(mapping[label])
+                              for label in CATEGORIES[column]], dtype=np.intp)
+            for column, mapping in CATEGORY_MAP.items()}
+NULLABLE_CATEGORIES = ["Weather", "Traffic_Level", "Time_of_Day"]
+
+
+def generate(n, rng=None, noise=NOISE_MINUTES, missing=MISSING_RATE, first_id=1):
+    """DataFrame of `n` synthetic orders with ingest.SCHEMA dtypes."""
+    rng = np.random.default_rng(rng)
+    codes = {column: rng.integers(0, len(labels), n) for column, labels in CATEGORIES.items()}
+    distance = rng.uniform(0.5, 20.0, n).round(2)
+    prep_time = rng.integers(5, 30, n)
+    experience = rng.integers(0, 10, n).astype(np.float32)
+
+    minutes, _ = score(distance, CODE_MAP["Traffic_Level"][codes["Traffic_Level"]],
+                       CODE_MAP["Weather"][codes["Weather"]],
+                       CODE_MAP["Vehicle_Type"][codes["Vehicle_Type"]],
+                       CODE_MAP["Time_of_Day"][codes["Time_of_Day"]], prep_time=prep_time)
+    minutes += experience * EXPERIENCE_MINUTES_PER_YEAR + rng.normal(0.0, noise, n)
+
+    for column in NULLABLE_CATEGORIES:
+        codes[column][rng.random(n) < missing] = -1
+    experience[rng.random(n) < missing] = np.nan
+
+    orders = pd.DataFrame({"Order_ID": np.arange(first_id, first_id + n, dtype=np.int64),
+                           "Distance_km": distance.astype(np.float32)})
+    for column, labels in CATEGORIES.items():
+        orders[column] = pd.Categorical.from_codes(codes[column], dtype=SCHEMA[column])
+    orders["Preparation_Time_min"] = prep_time.astype(np.int16)
+    orders["Courier_Experience_yrs"] = experience
+    orders["Delivery_Time_min"] = np.clip(np.rint(minutes), 1, None).astype(np.int16)
+    return orders[list(SCHEMA)]
+
+
+def _write_shard(path, n, seed, noise, missing, first_id):
+    generate(n, np.random.default_rng(seed), noise, missing, first_id).to_csv(path, index=False)
+    return path
+
+
+def write_shards(out, rows, shard_size=SHARD_SIZE, seed=0, noise=NOISE_MINUTES,
+                 missing=MISSING_RATE, workers=None):
+    """Write `rows` orders to CSV shards under `out`; returns the shard paths."""
+    os.makedirs(out, exist_ok=True)
+    n_shards = -(-rows // shard_size)
+    seeds = np.random.SeedSequence(seed).spawn(n_shards)
+    with ProcessPoolExecutor(workers) as pool:
+        futures = []
+        for i, shard_seed in enumerate(seeds):
+            n = min(shard_size, rows - i * shard_size)
+            path = os.path.join(out, f"orders-{i:05d}.csv")
+            futures.append(pool.submit(_write_shard, path, n, shard_seed, noise, missing,
+                                       i * shard_size + 1))
+        return [future.result() for future in futures]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--out", default="synthetic_orders", help="directory for the CSV shards")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--noise", type=float, default=NOISE_MINUTES, help="noise std in minutes")
+    parser.add_argument("--missing", type=float, default=MISSING_RATE,
+                        help="fraction of missing values per nullable column")
+    parser.add_argument("--workers", type=int, help="processes (default: one per core)")
+    args = parser.parse_args(argv)
+
+    paths = write_shards(args.out, args.rows, args.shard_size, args.seed, args.noise,
+                         args.missing, args.workers)
+    print(f"Wrote {args.rows:,} rows to {len(paths)} shards in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+import artifact
+from artifact import CURRENT_FILE, KEEP_VERSIONS, load_artifact, save_artifact, version_path
+from forest import FlatForest
+
+COLUMNS = ["a", "b", "c"]
+
+
+def fit(seed, n_estimators):
+    rng = np.random.default_rng(seed)
+    X = rng.random((300, len(COLUMNS))).astype(np.float32)
+    model = RandomForestRegressor(n_estimators=n_estimators, max_depth=4 + seed, random_state=seed)
+    return model.fit(X, X @ rng.random(len(COLUMNS))), X
+
+
+def versions(path):
+    return sorted(name for name in os.listdir(path) if name.startswith(artifact.VERSION_PREFIX))
+
+
+def test_save_does_not_touch_a_served_version(tmp_path):
+    path = str(tmp_path / "model")
+    old, X = fit(0, 5)
+    save_artifact(path, old, COLUMNS)
+    served = FlatForest.from_artifact(load_artifact(path))
+    before = served.predict(X)
+
+    new, _ = fit(1, 12)
+    save_artifact(path, new, COLUMNS)
+    np.testing.assert_array_equal(served.predict(X), before)
+    np.testing.assert_allclose(FlatForest.from_artifact(load_artifact(path)).predict(X),
+                               new.predict(X), rtol=1e-12)
+
+
+def test_old_versions_are_pruned(tmp_path):
+    path = str(tmp_path / "model")
+    model, _ = fit(0, 3)
+    for _ in range(KEEP_VERSIONS + 2):
+        save_artifact(path, model, COLUMNS)
+    kept = versions(path)
+    assert len(kept) == KEEP_VERSIONS
+    with open(os.path.join(path, CURRENT_FILE)) as f:
+        assert f.read() == kept[-1]
+
+
+def test_failed_save_leaves_the_current_version_live(tmp_path, monkeypatch):
+    path = str(tmp_path / "model")
+    model, _ = fit(0, 3)
+    save_artifact(path, model, COLUMNS)
+    live = version_path(path)
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(artifact.joblib, "dump", fail)
+    with pytest.raises(OSError):
+        save_artifact(path, fit(1, 4)[0], COLUMNS)
+    assert version_path(path) == live
+    assert versions(path) == [os.path.basename(live)]
+    assert load_artifact(path).meta["n_trees"] == 3
+
+
+def test_flat_layout_still_loads_and_is_replaced(tmp_path):
+    path = str(tmp_path / "model")
+    model, X = fit(0, 3)
+    save_artifact(path, model, COLUMNS)
+    # Recreate the old layout: the version's files directly in `path`
+    live = version_path(path)
+    for name in os.listdir(live):
+        os.replace(os.path.join(live, name), os.path.join(path, name))
+    os.rmdir(live)
+    os.remove(os.path.join(path, CURRENT_FILE))
+    assert load_artifact(path).path == path
+
+    save_artifact(path, model, COLUMNS)
+    assert sorted(os.listdir(path)) == [CURRENT_FILE] + versions(path)
+    np.testing.assert_allclose(FlatForest.from_artifact(load_artifact(path)).predict(X),
+                               model.predict(X), rtol=1e-12)
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import random_orders
+from encoder import OrderEncoder
+from model import CATEGORICAL_COLUMNS, FEATURE_COLUMNS, make_encoder
+
+
+def csv_orders(n, rng):
+    # Categoricals as strings, as read from the CSV
+    return random_orders(n, rng).astype({column: object for column in CATEGORICAL_COLUMNS})
+
+
+def dummies(orders, columns):
+    # The layout OrderEncoder replaced: get_dummies aligned to the training columns
+    encoded = pd.get_dummies(orders[FEATURE_COLUMNS], columns=CATEGORICAL_COLUMNS)
+    return encoded.reindex(columns=columns, fill_value=0).to_numpy(dtype=np.float32)
+
+
+def test_transform_matches_get_dummies():
+    rng = np.random.default_rng(0)
+    train = csv_orders(500, rng)
+    encoder = make_encoder().fit(train)
+    assert encoder.columns == list(pd.get_dummies(train[FEATURE_COLUMNS],
+                                                  columns=CATEGORICAL_COLUMNS).columns)
+
+    orders = csv_orders(500, rng)
+    for column in CATEGORICAL_COLUMNS:
+        orders.loc[rng.random(len(orders)) < 0.1, column] = np.nan
+    orders.loc[rng.random(len(orders)) < 0.1, "Distance_km"] = np.nan
+    orders.loc[0, "Weather"] = "Hail"  # unseen in training: all zeros
+    np.testing.assert_array_equal(encoder.transform(orders), dummies(orders, encoder.columns))
+
+
+def test_encode_row_and_from_columns_agree_with_transform():
+    rng = np.random.default_rng(1)
+    encoder = make_encoder().fit(random_orders(200, rng))
+    orders = random_orders(20, rng)
+    X = encoder.transform(orders)
+    for i, order in enumerate(orders[FEATURE_COLUMNS].to_dict("records")):
+        np.testing.assert_array_equal(encoder.encode_row(order), X[i])
+    rebuilt = OrderEncoder.from_columns(encoder.columns, CATEGORICAL_COLUMNS)
+    np.testing.assert_array_equal(rebuilt.transform(orders), X)
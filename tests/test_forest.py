@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from benchmarks.common import random_orders
+from forest import FlatForest
+from model import load_model, save_model, train_model
+
+
+def with_missing(orders, rng):
+    orders = orders.copy()
+    for column in ("Distance_km", "Courier_Experience_yrs"):
+        orders.loc[rng.random(len(orders)) < 0.1, column] = np.nan
+    return orders
+
+
+@pytest.fixture(scope="module")
+def forest():
+    rng = np.random.default_rng(0)
+    model, encoder, _ = train_model(with_missing(random_orders(2000, rng), rng), n_estimators=20)
+    model.set_params(n_jobs=None)
+    X = encoder.transform(with_missing(random_orders(5000, rng), rng))
+    assert np.isnan(X).any()
+    return model, encoder, X
+
+
+def test_flat_forest_matches_sklearn(forest):
+    model, _, X = forest
+    flat = FlatForest.from_model(model, batch_size=256)
+    np.testing.assert_allclose(flat.predict(X), model.predict(X), rtol=1e-12)
+
+
+def test_flat_forest_from_memory_mapped_artifact(forest, tmp_path):
+    model, encoder, X = forest
+    save_model(model, encoder, str(tmp_path / "model"))
+    flat, _ = load_model(str(tmp_path / "model"), flat=True)
+    assert isinstance(flat, FlatForest)
+    assert isinstance(flat.arrays["feature"], np.memmap)
+    np.testing.assert_allclose(flat.predict(X), model.predict(X), rtol=1e-12)
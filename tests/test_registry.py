@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from registry import PrepTimeRegistry, open_registry
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "restaurants.sqlite")
+
+
+def test_batched_merge_matches_direct_statistics(path):
+    rng = np.random.default_rng(0)
+    names = np.array([f"R{i}" for i in range(50)], dtype=object)
+    registry = PrepTimeRegistry(path)
+    seen_names, seen_minutes = [], []
+    for size in (1, 7, 300, 1000, 2):  # includes single-observation batches
+        batch_names = names[rng.integers(0, len(names), size)]
+        minutes = rng.normal(15, 4, size)
+        registry.observe(batch_names, minutes)
+        seen_names.append(batch_names)
+        seen_minutes.append(minutes)
+    seen_names, seen_minutes = np.concatenate(seen_names), np.concatenate(seen_minutes)
+
+    for name in set(seen_names):
+        x = seen_minutes[seen_names == name]
+        stats = registry.stats(name)
+        assert stats["n"] == len(x)
+        assert stats["mean"] == pytest.approx(x.mean(), rel=1e-12)
+        assert stats["std"] == pytest.approx(x.std(), rel=1e-9)
+    assert registry.stats("unknown") is None
+
+
+def test_seeded_prior_is_replaced_by_observations(path):
+    registry = open_registry(path, seed={"Pizza Palace": 10.0})
+    assert registry.prep_time("Pizza Palace") == 10.0
+    registry.observe(["Pizza Palace", "Pizza Palace"], [20.0, 30.0])
+    assert registry.stats("Pizza Palace") == {"n": 2, "mean": 25.0, "std": 5.0}
+
+
+def test_other_connections_commits_reach_the_cache(path):
+    app = open_registry(path, seed={"Pizza Palace": 10.0})
+    assert app.prep_time("Pizza Palace") == 10.0
+    assert app.prep_time("New Place", default=12.0) == 12.0  # cached miss
+    PrepTimeRegistry(path).observe(["Pizza Palace", "New Place"], [25.0, 30.0])
+    assert app.prep_time("Pizza Palace") == 25.0
+    np.testing.assert_array_equal(app.prep_times(["New Place", None, "x"], default=9.0),
+                                  [30.0, 9.0, 9.0])
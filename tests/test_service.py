@@ -0,0 +1,61 @@
+import json
+import math
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from service import heuristic_scorer, make_server
+
+ORDER = {"distance": 5, "traffic": "Low", "weather": "Clear", "vehicle": "Bike",
+         "time_of_day": "Morning"}
+
+
+def test_mixed_batch_scores_each_order_as_alone():
+    score_batch = heuristic_scorer()
+    others = [dict(ORDER, festival=True), dict(ORDER, prep_time=12), dict(ORDER, urgency="Express"),
+              dict(ORDER, extreme_delay=20), dict(ORDER, restaurant="Pizza Palace")]
+    alone = score_batch([ORDER])[0]
+    for other in others:
+        predictions = score_batch([ORDER, other])
+        assert predictions[0] == alone
+        assert predictions[1] == score_batch([other])[0]
+        assert not any(math.isnan(p) for p in predictions)
+
+
+@pytest.fixture
+def estimate(tmp_path):
+    server = make_server(port=0, model_path=str(tmp_path / "no_model"),
+                         registry_path=str(tmp_path / "restaurants.sqlite"))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/estimate"
+
+    def post(orders):
+        request = urllib.request.Request(url, json.dumps(orders).encode(),
+                                         {"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.read().decode()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode()
+
+    yield post
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("bad", [{"distance": None}, {"festival": "no"}, {"festival": 2}])
+def test_invalid_orders_are_rejected(estimate, bad):
+    status, body = estimate(dict(ORDER, **bad))
+    assert status == 400
+    assert "error" in json.loads(body)
+
+
+def test_festival_accepts_booleans_and_01(estimate):
+    status, body = estimate([ORDER, dict(ORDER, festival=0), dict(ORDER, festival=1),
+                             dict(ORDER, festival=True)])
+    assert status == 200
+    predictions = json.loads(body, parse_constant=pytest.fail)["predictions"]
+    assert predictions[0] == predictions[1]
+    assert predictions[2] == predictions[3] > predictions[0]
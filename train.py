@@ -0,0 +1,119 @@
+"""Train (or grow) the delivery-time forest and save it as an artifact.
+
+    python train.py --data Food_Delivery_Times.csv --out delivery_model
+    python train.py --out delivery_model --add-trees 50   # warm start
+    python train.py --model hgb --out delivery_model      # gradient boosting
+
+Trees are built on all cores by default. With --add-trees the existing
+artifact is loaded and only the new trees are fitted (sklearn warm start),
+using the artifact's encoder so the feature layout does not change. Wall
+time and peak resident memory are printed and stored in the artifact.
+With --metrics-out, per-stage timings (CSV parsing, encoding, fit,
+predict; see instrument.py) are also written in Prometheus text format.
+"""
+import argparse
+import os
+import sys
+import time
+
+from sklearn.ensemble import RandomForestRegressor
+
+from instrument import METRICS
+from model import (DATA_PATH, MODEL_PATH, MODEL_TYPES, load_data, load_model, save_model,
+                   train_model)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=DATA_PATH, help="training CSV or Parquet directory")
+    parser.add_argument("--out", default=MODEL_PATH, help="artifact directory")
+    parser.add_argument("--model", choices=MODEL_TYPES, default="forest",
+                        help="random forest, or histogram gradient boosting with native categoricals")
+    parser.add_argument("--n-estimators", type=int, default=100,
+                        help="trees (most boosting iterations for hgb)")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="-1 uses every core")
+    parser.add_argument("--add-trees", type=int, default=0,
+                        help="grow the forest in --out by this many trees instead of retraining")
+    parser.add_argument("--random-state", type=int, default=42)
+    parser.add_argument("--metrics-out", help="write stage timings here in Prometheus text format")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    start = time.perf_counter()
+    df = load_data(args.data)
+    load_time = time.perf_counter() - start
+
+    if args.add_trees:
+        if args.model != "forest":
+            raise SystemExit("--add-trees only grows random forests")
+        if not os.path.exists(args.out):
+            raise SystemExit(f"--add-trees needs an existing artifact at {args.out}")
+        model, encoder = load_model(args.out)
+        if not isinstance(model, RandomForestRegressor):
+            raise SystemExit(f"--add-trees only grows random forests; {args.out} holds "
+                             f"{type(model).__name__}")
+        model.set_params(warm_start=True, n_jobs=args.n_jobs,
+                         n_estimators=len(model.estimators_) + args.add_trees)
+    else:
+        model = encoder = None
+
+    if args.model == "hgb":
+        params = {"max_iter": args.n_estimators}
+    else:
+        params = {"n_estimators": args.n_estimators, "n_jobs": args.n_jobs}
+
+    start = time.perf_counter()
+    model, encoder, metrics = train_model(df, random_state=args.random_state, model=model,
+                                          encoder=encoder, model_type=args.model, **params)
+    fit_time = time.perf_counter() - start
+    model.set_params(warm_start=False)
+    n_trees = model.n_iter_ if args.model == "hgb" else len(model.estimators_)
+
+    training = {
+        "rows": len(df),
+        "model": args.model,
+        "n_estimators": n_trees,
+        "trees_fitted": args.add_trees or n_trees,
+        "n_jobs": args.n_jobs if args.model == "forest" else None,
+        "load_seconds": round(load_time, 3),
+        "fit_seconds": round(fit_time, 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    save_model(model, encoder, args.out, metrics=metrics, training=training, data_path=args.data)
+
+    print(f"Rows: {training['rows']:,}")
+    if args.model == "hgb":
+        print(f"Boosting iterations: {training['n_estimators']}")
+    else:
+        print(f"Trees: {training['n_estimators']} ({training['trees_fitted']} fitted this run, "
+              f"n_jobs={args.n_jobs})")
+    print(f"Load time: {load_time:.2f} s")
+    print(f"Fit time: {fit_time:.2f} s")
+    if training["peak_rss_mb"] is not None:
+        print(f"Peak memory: {training['peak_rss_mb']:.1f} MB")
+    for name, value in metrics.items():
+        print(f"{name}: {value:.4f}")
+    if args.metrics_out:
+        METRICS.write_prometheus(args.metrics_out)
+    return training
+
+
+if __name__ == "__main__":
+    main()
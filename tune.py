@@ -0,0 +1,139 @@
+"""Hyperparameter search for the delivery-time forest.
+
+    python tune.py --data Food_Delivery_Times.csv --out delivery_model
+
+Runs HalvingRandomSearchCV (successive halving over training rows: many
+candidates are scored on a small sample, the best third moves on to three
+times as many rows) across a process pool. The training split is encoded
+once into a float32 matrix and the K-fold indices are computed once, so
+every candidate and every worker sees the same folds; joblib memory-maps
+the shared matrix into the workers instead of pickling it per task.
+
+The final candidates are refitted on the whole training split and timed
+(FlatForest on one row, sklearn on a batch). The fastest one whose
+cross-validated MAE from the last halving round is within --tolerance of
+the best is chosen; only that model is scored on the test split, and it
+is saved with those test metrics and the search results in the artifact
+metadata.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingRandomSearchCV, KFold, train_test_split
+
+from compress import predict_latency
+from forest import FlatForest
+from model import (DATA_PATH, FEATURE_COLUMNS, MODEL_PATH, TARGET, evaluate, load_data,
+                   make_encoder, save_model)
+
+PARAM_DISTRIBUTIONS = {
+    "n_estimators": [25, 50, 100, 200, 400],
+    "max_depth": [8, 12, 16, 20, None],
+    "min_samples_leaf": [1, 2, 5, 10, 20],
+    "max_features": [0.3, 0.5, 0.7, 1.0, "sqrt"],
+}
+
+
+def search(X, y, n_candidates=60, folds=5, n_jobs=-1, random_state=42, verbose=0):
+    """Fitted HalvingRandomSearchCV over PARAM_DISTRIBUTIONS (scored by MAE)."""
+    splits = list(KFold(folds, shuffle=True, random_state=random_state).split(X))
+    # Parallelism is across candidates and folds; each forest fits on one core
+    estimator = RandomForestRegressor(n_jobs=1, random_state=random_state)
+    searcher = HalvingRandomSearchCV(
+        estimator, PARAM_DISTRIBUTIONS, n_candidates=n_candidates, factor=3, cv=splits,
+        scoring="neg_mean_absolute_error", refit=False, n_jobs=n_jobs,
+        random_state=random_state, verbose=verbose,
+    )
+    return searcher.fit(X, y)
+
+
+def finalists(searcher, top):
+    """The `top` best candidates of the last halving round: params and CV MAE."""
+    results = pd.DataFrame(searcher.cv_results_)
+    last = results[results["iter"] == results["iter"].max()]
+    best = last.sort_values("rank_test_score").head(top)
+    return pd.DataFrame({"params": best["params"].tolist(),
+                         "cv_MAE": -best["mean_test_score"].to_numpy()})
+
+
+def compare(candidates, X_train, y_train, n_jobs=-1, random_state=42):
+    """Refit each finalist on the training rows; returns (table, fitted models)."""
+    rows, models = [], []
+    for params, cv_mae in zip(candidates["params"], candidates["cv_MAE"]):
+        model = RandomForestRegressor(n_jobs=n_jobs, random_state=random_state, **params)
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_time = time.perf_counter() - start
+        model.set_params(n_jobs=None)
+        flat = FlatForest.from_model(model)
+        rows.append({
+            **{name: params.get(name) for name in PARAM_DISTRIBUTIONS},
+            "cv_MAE": cv_mae,
+            "fit_s": fit_time,
+            "latency_1_ms": predict_latency(flat, X_train[:1]) * 1e3,
+            "latency_10k_ms": predict_latency(model, X_train[:10_000], repeat=3) * 1e3,
+        })
+        models.append(model)
+    return pd.DataFrame(rows), models
+
+
+def choose(table, tolerance):
+    """Index of the fastest single-row candidate within `tolerance` of the best CV MAE."""
+    eligible = table[table["cv_MAE"] <= table["cv_MAE"].min() * (1 + tolerance)]
+    return int(eligible["latency_1_ms"].idxmin())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=DATA_PATH, help="training CSV or Parquet directory")
+    parser.add_argument("--out", default=MODEL_PATH, help="artifact directory for the chosen model")
+    parser.add_argument("--candidates", type=int, default=60, help="parameter sets sampled")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="finalists refitted and timed")
+    parser.add_argument("--tolerance", type=float, default=0.02,
+                        help="CV MAE slack (fraction) traded for lower latency")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="-1 uses every core")
+    parser.add_argument("--random-state", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    df = load_data(args.data)
+    # Same test split as model.train_model(); the search only sees the training rows
+    train, test = train_test_split(df, test_size=0.2, random_state=args.random_state)
+    encoder = make_encoder().fit(train[FEATURE_COLUMNS])
+    X_train = encoder.transform(train[FEATURE_COLUMNS])
+    X_test = encoder.transform(test[FEATURE_COLUMNS])
+    y_train = train[TARGET].to_numpy(dtype=np.float64)
+    y_test = test[TARGET].to_numpy(dtype=np.float64)
+
+    start = time.perf_counter()
+    searcher = search(X_train, y_train, args.candidates, args.folds, args.n_jobs,
+                      args.random_state)
+    search_time = time.perf_counter() - start
+    print(f"Search: {args.candidates} candidates, {searcher.n_iterations_} rounds, "
+          f"{search_time:.1f} s")
+
+    table, models = compare(finalists(searcher, args.top), X_train, y_train, args.n_jobs,
+                            args.random_state)
+    chosen = choose(table, args.tolerance)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(table.round(3))
+    # The test split is used once, for the chosen model only
+    metrics = evaluate(y_test, models[chosen].predict(X_test))
+    print(f"Chosen: row {chosen} ({table.loc[chosen, 'cv_MAE']:.3f} CV MAE, "
+          f"{table.loc[chosen, 'latency_1_ms']:.3f} ms per order); "
+          f"test MAE {metrics['MAE']:.3f}, R2 {metrics['R2']:.3f}")
+
+    tuning = {"search_seconds": round(search_time, 3), "candidates": args.candidates,
+              "folds": args.folds, "chosen": chosen,
+              "finalists": table.astype(object).where(table.notna(), None).to_dict("records")}
+    save_model(models[chosen], encoder, args.out, metrics=metrics, tuning=tuning,
+               data_path=args.data)
+    return table
+
+
+if __name__ == "__main__":
+    main()